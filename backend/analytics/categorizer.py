@@ -212,15 +212,13 @@ class TransactionCategorizer:
                 monthly_data[month]['spent'] += amount
                 monthly_data[month]['categories'][transaction.category] += amount
                 monthly_data[month]['bank'][transaction.bank.title()] += amount
-                # Get necessity and recurrence from transaction (can be enum or string)
-                necessity = getattr(transaction, 'necessity', None)
+                # Necessity and recurrence are plain strings (empty when untagged)
+                necessity = transaction.necessity
                 if necessity:
-                    nec_val = necessity.value if hasattr(necessity, 'value') else necessity
-                    monthly_data[month]['necessity'][nec_val] += amount
-                recurrence = getattr(transaction, 'recurrence', None)
+                    monthly_data[month]['necessity'][necessity] += amount
+                recurrence = transaction.recurrence
                 if recurrence:
-                    rec_val = recurrence.value if hasattr(recurrence, 'value') else recurrence
-                    monthly_data[month]['recurrence'][rec_val] += amount
+                    monthly_data[month]['recurrence'][recurrence] += amount
             else:
                 monthly_data[month]['income'] += transaction.amount
             
@@ -273,15 +271,13 @@ class TransactionCategorizer:
                 weekly_data[week_key]['spent'] += amount
                 weekly_data[week_key]['categories'][transaction.category] += amount
                 weekly_data[week_key]['bank'][transaction.bank.title()] += amount
-                # Get necessity and recurrence from transaction (can be enum or string)
-                necessity = getattr(transaction, 'necessity', None)
+                # Necessity and recurrence are plain strings (empty when untagged)
+                necessity = transaction.necessity
                 if necessity:
-                    nec_val = necessity.value if hasattr(necessity, 'value') else necessity
-                    weekly_data[week_key]['necessity'][nec_val] += amount
-                recurrence = getattr(transaction, 'recurrence', None)
+                    weekly_data[week_key]['necessity'][necessity] += amount
+                recurrence = transaction.recurrence
                 if recurrence:
-                    rec_val = recurrence.value if hasattr(recurrence, 'value') else recurrence
-                    weekly_data[week_key]['recurrence'][rec_val] += amount
+                    weekly_data[week_key]['recurrence'][recurrence] += amount
             else:
                 weekly_data[week_key]['income'] += transaction.amount
             
@@ -343,15 +339,13 @@ class TransactionCategorizer:
                     daily_data[date_key]['spent'] += amount
                     daily_data[date_key]['categories'][transaction.category] += amount
                     daily_data[date_key]['bank'][transaction.bank.title()] += amount
-                    # Get necessity and recurrence from transaction (can be enum or string)
-                    necessity = getattr(transaction, 'necessity', None)
+                    # Necessity and recurrence are plain strings (empty when untagged)
+                    necessity = transaction.necessity
                     if necessity:
-                        nec_val = necessity.value if hasattr(necessity, 'value') else necessity
-                        daily_data[date_key]['necessity'][nec_val] += amount
-                    recurrence = getattr(transaction, 'recurrence', None)
+                        daily_data[date_key]['necessity'][necessity] += amount
+                    recurrence = transaction.recurrence
                     if recurrence:
-                        rec_val = recurrence.value if hasattr(recurrence, 'value') else recurrence
-                        daily_data[date_key]['recurrence'][rec_val] += amount
+                        daily_data[date_key]['recurrence'][recurrence] += amount
                 else:
                     daily_data[date_key]['income'] += transaction.amount
                 
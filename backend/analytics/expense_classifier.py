@@ -7,10 +7,49 @@ including:
 - Subscription and recurring expense detection
 - Budget health analysis
 """
-from typing import List, Dict, Set, Tuple
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import List, Dict, FrozenSet, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
 from backend.models.transaction import (
     Transaction, NecessityLevel, RecurrenceType
 )
+from backend.analytics.transaction_table import TransactionTable
+
+# Optional C-backed multi-pattern matcher; falls back to compiled regexes
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+
+def _trie_pattern(keywords) -> str:
+    """
+    Build a regex alternation shaped like a prefix tree of the keywords.
+    
+    Keywords sharing a first character share one branch (e.g. 'net(?:flix|...)'),
+    so at each position the regex engine only follows the branch for the
+    current character instead of trying every keyword. Since the pattern is
+    only used with search(), a keyword that is a prefix of another ends its
+    branch - the longer keyword can never be the only match.
+    """
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}  # End of keyword
+    
+    def emit(node: Dict[str, dict]) -> str:
+        if '' in node:
+            return ''
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    
+    return emit(trie)
 
 
 class ExpenseClassifier:
@@ -23,7 +62,7 @@ class ExpenseClassifier:
     # =========================================================================
     
     # Known subscription services (lowercase for matching)
-    SUBSCRIPTION_KEYWORDS: Set[str] = {
+    SUBSCRIPTION_KEYWORDS: FrozenSet[str] = frozenset({
         # Streaming & Entertainment
         'netflix', 'hulu', 'disney+', 'disney plus', 'hbo max', 'hbo', 'paramount+',
         'peacock', 'apple tv', 'amazon prime', 'prime video', 'spotify', 'apple music',
@@ -56,18 +95,18 @@ class ExpenseClassifier:
         'factor', 'freshly', 'sunbasket',
         
         # Shopping & Memberships
-        'amazon prime', 'costco membership', 'sam\'s club', 'bj\'s',
+        'costco membership', 'sam\'s club', 'bj\'s',
         'walmart+', 'target circle', 'shipt',
         
         # Other Services
         'patreon', 'onlyfans', 'twitch', 'discord nitro',
-    }
+    })
     
     # =========================================================================
     # RECURRING EXPENSE PATTERNS (for recurrence detection)
     # =========================================================================
     
-    RECURRING_EXPENSE_KEYWORDS: Set[str] = {
+    RECURRING_EXPENSE_KEYWORDS: FrozenSet[str] = frozenset({
         # Housing
         'rent', 'mortgage', 'hoa', 'property tax', 'home insurance',
         'renters insurance', 'homeowners',
@@ -88,13 +127,13 @@ class ExpenseClassifier:
         
         # Childcare
         'daycare', 'childcare', 'tuition',
-    }
+    })
     
     # =========================================================================
     # ESSENTIAL/NEEDS CATEGORIES
     # =========================================================================
     
-    ESSENTIAL_CATEGORIES: Set[str] = {
+    ESSENTIAL_CATEGORIES: FrozenSet[str] = frozenset({
         'groceries', 'supermarkets', 'grocery',
         'utilities', 'bills & utilities',
         'healthcare', 'medical', 'pharmacy', 'health',
@@ -102,9 +141,9 @@ class ExpenseClassifier:
         'housing', 'rent', 'mortgage',
         'insurance',
         'childcare', 'education',
-    }
+    })
     
-    ESSENTIAL_KEYWORDS: Set[str] = {
+    ESSENTIAL_KEYWORDS: FrozenSet[str] = frozenset({
         # Food essentials
         'grocery', 'supermarket', 'whole foods', 'trader joe', 'safeway',
         'kroger', 'publix', 'aldi', 'lidl', 'food lion', 'wegmans',
@@ -130,23 +169,23 @@ class ExpenseClassifier:
         
         # Childcare
         'daycare', 'childcare', 'school', 'tuition',
-    }
+    })
     
     # =========================================================================
     # DISCRETIONARY/WANTS CATEGORIES
     # =========================================================================
     
-    DISCRETIONARY_CATEGORIES: Set[str] = {
+    DISCRETIONARY_CATEGORIES: FrozenSet[str] = frozenset({
         'entertainment', 'food & dining', 'restaurants', 'shopping',
         'travel', 'travel/ entertainment', 'merchandise',
         'personal care', 'gifts', 'hobbies',
-    }
+    })
     
-    DISCRETIONARY_KEYWORDS: Set[str] = {
+    DISCRETIONARY_KEYWORDS: FrozenSet[str] = frozenset({
         # Dining out
         'restaurant', 'cafe', 'coffee', 'starbucks', 'dunkin', 'mcdonald',
         'burger', 'pizza', 'chipotle', 'taco bell', 'wendy\'s', 'chick-fil-a',
-        'panera', 'subway', 'jimmy john', 'panda express', 'olive garden',
+        'panera', 'jimmy john', 'panda express', 'olive garden',
         'applebee', 'chili\'s', 'buffalo wild', 'ihop', 'denny\'s',
         'doordash', 'uber eats', 'grubhub', 'postmates', 'seamless',
         
@@ -174,13 +213,13 @@ class ExpenseClassifier:
         'hotel', 'airbnb', 'vrbo', 'expedia', 'booking.com', 'kayak',
         'airline', 'delta', 'united', 'american airlines', 'southwest',
         'jetblue', 'spirit', 'frontier',
-    }
+    })
     
     # =========================================================================
     # SAVINGS/INVESTMENT KEYWORDS
     # =========================================================================
     
-    SAVINGS_KEYWORDS: Set[str] = {
+    SAVINGS_KEYWORDS: FrozenSet[str] = frozenset({
         # Investments
         'vanguard', 'fidelity', 'schwab', 'td ameritrade', 'e*trade',
         'robinhood', 'webull', 'betterment', 'wealthfront', 'acorns',
@@ -195,7 +234,116 @@ class ExpenseClassifier:
         
         # Crypto
         'coinbase', 'binance', 'kraken', 'gemini', 'crypto.com',
-    }
+    })
+    
+    # =========================================================================
+    # BUDGET HEALTH THRESHOLDS
+    # =========================================================================
+    
+    # Needs/wants: a percentage at or below BOUNDS[i] falls in band i, anything
+    # above the last bound falls in the final band. Bands are (status, message).
+    NEEDS_BOUNDS = [50, 55, 65]
+    NEEDS_BANDS = [
+        ('good', "Excellent! Your essential spending is well controlled."),
+        ('good', "Good, but watch for lifestyle creep in essentials."),
+        ('warning', "Your needs are taking a bigger share. Look for savings."),
+        ('critical', "Essential costs are high. Consider reducing fixed expenses."),
+    ]
+    
+    WANTS_BOUNDS = [30, 35, 45]
+    WANTS_BANDS = [
+        ('good', "Great balance! You're disciplined with discretionary spending."),
+        ('good', "Slightly over target. Small cuts can make a difference."),
+        ('warning', "Discretionary spending is elevated. Review subscriptions."),
+        ('critical', "High discretionary spending. Identify areas to cut back."),
+    ]
+    
+    # Savings: a percentage at or above BOUNDS[i] falls in band i + 1
+    SAVINGS_BOUNDS = [10, 15, 20]
+    SAVINGS_BANDS = [
+        ('critical', "Low savings rate. Consider the 'pay yourself first' approach."),
+        ('warning', "Below target. Try to automate more savings."),
+        ('good', "Good progress, but try to increase savings slightly."),
+        ('good', "Excellent! You're on track for financial security."),
+    ]
+    
+    # Overall health: a summed status score at or above BOUNDS[i] gets label i + 1
+    STATUS_SCORES = {'good': 3, 'warning': 2, 'critical': 1}
+    OVERALL_BOUNDS = [4, 6, 8]
+    OVERALL_LABELS = ['Critical', 'Needs Improvement', 'Good', 'Excellent']
+    
+    # =========================================================================
+    # KEYWORD MATCHING
+    # =========================================================================
+    
+    # Keyword group tags stored as the automaton payload
+    SAVINGS_GROUP = 0
+    NEEDS_GROUP = 1
+    WANTS_GROUP = 2
+    SUBSCRIPTION_GROUP = 3
+    RECURRING_GROUP = 4
+    
+    _automaton = None  # Built lazily on first use
+    _keyword_patterns = None  # Regex fallback when pyahocorasick is unavailable
+    
+    @classmethod
+    def _keyword_groups(cls) -> List[Tuple[int, FrozenSet[str]]]:
+        """Get each keyword set paired with its group tag."""
+        return [
+            (cls.SAVINGS_GROUP, cls.SAVINGS_KEYWORDS),
+            (cls.NEEDS_GROUP, cls.ESSENTIAL_KEYWORDS),
+            (cls.WANTS_GROUP, cls.DISCRETIONARY_KEYWORDS),
+            (cls.SUBSCRIPTION_GROUP, cls.SUBSCRIPTION_KEYWORDS),
+            (cls.RECURRING_GROUP, cls.RECURRING_EXPENSE_KEYWORDS),
+        ]
+    
+    @classmethod
+    def _get_automaton(cls):
+        """Build the Aho-Corasick automaton over all keyword sets (once)."""
+        if cls._automaton is None and ahocorasick is not None:
+            # A keyword can belong to several groups (e.g. 'rent' is both
+            # recurring and essential), so each entry carries all of its tags
+            keyword_groups: Dict[str, Set[int]] = {}
+            for group, keywords in cls._keyword_groups():
+                for keyword in keywords:
+                    keyword_groups.setdefault(keyword, set()).add(group)
+            
+            automaton = ahocorasick.Automaton()
+            for keyword, groups in keyword_groups.items():
+                automaton.add_word(keyword, frozenset(groups))
+            automaton.make_automaton()
+            cls._automaton = automaton
+        return cls._automaton
+    
+    @classmethod
+    def _get_keyword_patterns(cls) -> List[Tuple[int, 're.Pattern']]:
+        """Compile one prefix-tree shaped regex per keyword group (once)."""
+        if cls._keyword_patterns is None:
+            cls._keyword_patterns = [
+                (group, re.compile(_trie_pattern(keywords)))
+                for group, keywords in cls._keyword_groups()
+            ]
+        return cls._keyword_patterns
+    
+    @classmethod
+    def _match_keyword_groups(cls, desc_lower: str) -> Set[int]:
+        """
+        Find which keyword groups have at least one keyword in the description.
+        
+        Uses a single pass of the Aho-Corasick automaton when pyahocorasick is
+        installed, otherwise one prefix-tree regex search per keyword group.
+        """
+        automaton = cls._get_automaton()
+        if automaton is None:
+            return {
+                group for group, pattern in cls._get_keyword_patterns()
+                if pattern.search(desc_lower)
+            }
+        
+        matched = set()
+        for _, groups in automaton.iter(desc_lower):
+            matched |= groups
+        return matched
     
     # =========================================================================
     # CLASSIFICATION METHODS
@@ -215,17 +363,17 @@ class ExpenseClassifier:
         Returns:
             Transaction with all classification fields populated
         """
-        desc_lower = transaction.description.lower()
+        desc_lower = transaction.description_lower
         
         # Income detection - income is not a necessity level (needs/wants/savings)
         # so we mark it as Unknown for necessity, but still classify recurrence
         if transaction.is_income:
             transaction.necessity = NecessityLevel.UNKNOWN  # Income isn't needs/wants/savings
-            transaction.recurrence = cls._classify_recurrence(desc_lower, transaction.amount)
+            transaction.recurrence = cls._classify_recurrence(desc_lower)
             return transaction
         
         # Classify recurrence
-        transaction.recurrence = cls._classify_recurrence(desc_lower, transaction.amount)
+        transaction.recurrence = cls._classify_recurrence(desc_lower)
         
         # Necessity is NOT auto-classified - leave as Unknown for user to tag manually
         transaction.necessity = NecessityLevel.UNKNOWN
@@ -235,57 +383,63 @@ class ExpenseClassifier:
     @classmethod
     def classify_batch(cls, transactions: List[Transaction]) -> List[Transaction]:
         """
-        Classify a batch of transactions.
+        Classify a batch of transactions in place.
         
         Args:
             transactions: List of transactions to classify
             
         Returns:
-            List of classified transactions
+            The same list, with every transaction classified
         """
-        return [cls.classify(t) for t in transactions]
+        for t in transactions:
+            cls.classify(t)
+        return transactions
     
     @classmethod
     def _classify_necessity(cls, desc_lower: str, cat_lower: str) -> str:
         """Classify as Needs, Wants, or Savings based on 50/30/20 rule."""
+        groups = cls._match_keyword_groups(desc_lower)
+        
         # Check for savings/investment
-        for keyword in cls.SAVINGS_KEYWORDS:
-            if keyword in desc_lower:
-                return NecessityLevel.SAVINGS
+        if cls.SAVINGS_GROUP in groups:
+            return NecessityLevel.SAVINGS
         
         # Check for essential categories
         if cat_lower in cls.ESSENTIAL_CATEGORIES:
             return NecessityLevel.NEEDS
         
         # Check for essential keywords
-        for keyword in cls.ESSENTIAL_KEYWORDS:
-            if keyword in desc_lower:
-                return NecessityLevel.NEEDS
+        if cls.NEEDS_GROUP in groups:
+            return NecessityLevel.NEEDS
         
         # Check for discretionary categories
         if cat_lower in cls.DISCRETIONARY_CATEGORIES:
             return NecessityLevel.WANTS
         
         # Check for discretionary keywords
-        for keyword in cls.DISCRETIONARY_KEYWORDS:
-            if keyword in desc_lower:
-                return NecessityLevel.WANTS
+        if cls.WANTS_GROUP in groups:
+            return NecessityLevel.WANTS
         
         # Default to Unknown - let user or rules decide
         return NecessityLevel.UNKNOWN
     
     @classmethod
-    def _classify_recurrence(cls, desc_lower: str, amount: float) -> str:
-        """Determine if transaction is subscription, recurring, or one-time."""
+    @lru_cache(maxsize=8192)
+    def _classify_recurrence(cls, desc_lower: str) -> str:
+        """
+        Determine if transaction is subscription, recurring, or one-time.
+        
+        Cached per description since the same merchants recur every month.
+        """
+        groups = cls._match_keyword_groups(desc_lower)
+        
         # Check for subscription keywords
-        for keyword in cls.SUBSCRIPTION_KEYWORDS:
-            if keyword in desc_lower:
-                return RecurrenceType.SUBSCRIPTION
+        if cls.SUBSCRIPTION_GROUP in groups:
+            return RecurrenceType.SUBSCRIPTION
         
         # Check for recurring expense keywords
-        for keyword in cls.RECURRING_EXPENSE_KEYWORDS:
-            if keyword in desc_lower:
-                return RecurrenceType.RECURRING
+        if cls.RECURRING_GROUP in groups:
+            return RecurrenceType.RECURRING
         
         # Default to one-time
         return RecurrenceType.ONE_TIME
@@ -295,48 +449,59 @@ class ExpenseClassifier:
     # =========================================================================
     
     @classmethod
-    def analyze_by_dimension(cls, transactions: List[Transaction]) -> Dict[str, Dict]:
+    def analyze_by_dimension(cls, transactions: List[Transaction],
+                             table: Optional[TransactionTable] = None) -> Dict[str, Dict]:
         """
         Analyze spending across all classification dimensions.
         
+        Args:
+            transactions: List of transactions to analyze
+            table: Optional TransactionTable already built from the same transactions,
+                   so several analyses in one request can share it
+        
         Returns:
             Dictionary with analysis for each dimension
         """
-        # Filter to expenses only
-        expenses = [t for t in transactions if t.is_expense]
+        if table is None:
+            table = TransactionTable(transactions)
         
-        if not expenses:
+        # Only expenses are analyzed
+        if not table.is_expense.any():
             return {}
         
-        total = sum(abs(t.amount) for t in expenses)
+        total = table.expense_total()
         
         return {
-            'by_necessity': cls._group_and_sum(expenses, 'necessity', total),
-            'by_recurrence': cls._group_and_sum(expenses, 'recurrence', total),
+            'by_necessity': cls._group_and_sum(table, 'necessity', total),
+            'by_recurrence': cls._group_and_sum(table, 'recurrence', total),
         }
     
     @classmethod
-    def _group_and_sum(cls, transactions: List[Transaction], field: str, total: float) -> Dict:
-        """Group transactions by a field and calculate totals."""
-        groups: Dict[str, Dict] = {}
+    def _group_and_sum(cls, table: TransactionTable, field: str, total: float) -> Dict:
+        """Group expenses by a coded column ('necessity' or 'recurrence') and calculate totals."""
+        codes = getattr(table, field)[table.is_expense]
+        labels = getattr(table, f'{field}_labels')
         
-        for t in transactions:
-            key = str(getattr(t, field))
-            if key not in groups:
-                groups[key] = {'total': 0, 'count': 0, 'transactions': []}
-            groups[key]['total'] += abs(t.amount)
-            groups[key]['count'] += 1
-        
-        # Calculate percentages and round
-        for key in groups:
-            groups[key]['total'] = round(groups[key]['total'], 2)
-            groups[key]['percentage'] = round((groups[key]['total'] / total * 100), 1) if total > 0 else 0
-            del groups[key]['transactions']  # Don't include full transaction objects
+        totals = np.bincount(codes, weights=table.abs_cents[table.is_expense], minlength=len(labels)) / 100
+        counts = np.bincount(codes, minlength=len(labels))
+        
+        # Visit groups in order of first appearance so ties keep a stable order
+        present, first_seen = np.unique(codes, return_index=True)
+        
+        groups: Dict[str, Dict] = {}
+        for code in present[np.argsort(first_seen)]:
+            group_total = round(float(totals[code]), 2)
+            groups[labels[code]] = {
+                'total': group_total,
+                'count': int(counts[code]),
+                'percentage': round((group_total / total * 100), 1) if total > 0 else 0
+            }
         
         return dict(sorted(groups.items(), key=lambda x: x[1]['total'], reverse=True))
     
     @classmethod
-    def get_budget_health(cls, transactions: List[Transaction]) -> Dict:
+    def get_budget_health(cls, transactions: List[Transaction],
+                          table: Optional[TransactionTable] = None) -> Dict:
         """
         Analyze budget health based on 50/30/20 rule.
         
@@ -344,28 +509,40 @@ class ExpenseClassifier:
         30% Wants (discretionary spending)
         20% Savings (financial goals)
         
+        Args:
+            transactions: List of transactions to analyze
+            table: Optional TransactionTable already built from the same transactions
+        
         Returns:
             Dictionary with budget health metrics
         """
-        expenses = [t for t in transactions if t.is_expense]
+        if table is None:
+            table = TransactionTable(transactions)
         
-        if not expenses:
+        if not table.is_expense.any():
             return {'error': 'No expenses to analyze'}
         
-        total = sum(abs(t.amount) for t in expenses)
+        # Sum expense cents per necessity code in a single pass
+        necessity_totals = np.bincount(
+            table.necessity[table.is_expense],
+            weights=table.abs_cents[table.is_expense],
+            minlength=len(table.necessity_labels)
+        ) / 100
         
-        needs_total = sum(abs(t.amount) for t in expenses if t.necessity == NecessityLevel.NEEDS)
-        wants_total = sum(abs(t.amount) for t in expenses if t.necessity == NecessityLevel.WANTS)
-        savings_total = sum(abs(t.amount) for t in expenses if t.necessity == NecessityLevel.SAVINGS)
+        total = float(necessity_totals.sum())
+        
+        needs_total = float(necessity_totals[table.necessity_code(NecessityLevel.NEEDS)])
+        wants_total = float(necessity_totals[table.necessity_code(NecessityLevel.WANTS)])
+        savings_total = float(necessity_totals[table.necessity_code(NecessityLevel.SAVINGS)])
         
         needs_pct = (needs_total / total * 100) if total > 0 else 0
         wants_pct = (wants_total / total * 100) if total > 0 else 0
         savings_pct = (savings_total / total * 100) if total > 0 else 0
         
-        # Determine health status
-        needs_status = 'good' if needs_pct <= 55 else 'warning' if needs_pct <= 65 else 'critical'
-        wants_status = 'good' if wants_pct <= 35 else 'warning' if wants_pct <= 45 else 'critical'
-        savings_status = 'good' if savings_pct >= 15 else 'warning' if savings_pct >= 10 else 'critical'
+        # Determine health status and message from the threshold bands
+        needs_status, needs_message = cls.NEEDS_BANDS[bisect_left(cls.NEEDS_BOUNDS, needs_pct)]
+        wants_status, wants_message = cls.WANTS_BANDS[bisect_left(cls.WANTS_BOUNDS, wants_pct)]
+        savings_status, savings_message = cls.SAVINGS_BANDS[bisect_right(cls.SAVINGS_BOUNDS, savings_pct)]
         
         return {
             'total_spending': round(total, 2),
@@ -374,71 +551,31 @@ class ExpenseClassifier:
                 'percentage': round(needs_pct, 1),
                 'target': 50,
                 'status': needs_status,
-                'message': cls._get_needs_message(needs_pct)
+                'message': needs_message
             },
             'wants': {
                 'total': round(wants_total, 2),
                 'percentage': round(wants_pct, 1),
                 'target': 30,
                 'status': wants_status,
-                'message': cls._get_wants_message(wants_pct)
+                'message': wants_message
             },
             'savings': {
                 'total': round(savings_total, 2),
                 'percentage': round(savings_pct, 1),
                 'target': 20,
                 'status': savings_status,
-                'message': cls._get_savings_message(savings_pct)
+                'message': savings_message
             },
             'overall_health': cls._get_overall_health(needs_status, wants_status, savings_status)
         }
     
-    @classmethod
-    def _get_needs_message(cls, pct: float) -> str:
-        if pct <= 50:
-            return "Excellent! Your essential spending is well controlled."
-        elif pct <= 55:
-            return "Good, but watch for lifestyle creep in essentials."
-        elif pct <= 65:
-            return "Your needs are taking a bigger share. Look for savings."
-        else:
-            return "Essential costs are high. Consider reducing fixed expenses."
-    
-    @classmethod
-    def _get_wants_message(cls, pct: float) -> str:
-        if pct <= 30:
-            return "Great balance! You're disciplined with discretionary spending."
-        elif pct <= 35:
-            return "Slightly over target. Small cuts can make a difference."
-        elif pct <= 45:
-            return "Discretionary spending is elevated. Review subscriptions."
-        else:
-            return "High discretionary spending. Identify areas to cut back."
-    
-    @classmethod
-    def _get_savings_message(cls, pct: float) -> str:
-        if pct >= 20:
-            return "Excellent! You're on track for financial security."
-        elif pct >= 15:
-            return "Good progress, but try to increase savings slightly."
-        elif pct >= 10:
-            return "Below target. Try to automate more savings."
-        else:
-            return "Low savings rate. Consider the 'pay yourself first' approach."
-    
     @classmethod
     def _get_overall_health(cls, needs: str, wants: str, savings: str) -> str:
-        scores = {'good': 3, 'warning': 2, 'critical': 1}
+        scores = cls.STATUS_SCORES
         total_score = scores[needs] + scores[wants] + scores[savings]
         
-        if total_score >= 8:
-            return "Excellent"
-        elif total_score >= 6:
-            return "Good"
-        elif total_score >= 4:
-            return "Needs Improvement"
-        else:
-            return "Critical"
+        return cls.OVERALL_LABELS[bisect_right(cls.OVERALL_BOUNDS, total_score)]
     
     @classmethod
     def get_subscription_summary(cls, transactions: List[Transaction]) -> Dict:
@@ -453,39 +590,36 @@ class ExpenseClassifier:
         if not subscriptions:
             return {'total': 0, 'count': 0, 'monthly_estimate': 0, 'subscriptions': []}
         
-        # Group by description to find unique subscriptions
-        sub_groups: Dict[str, Dict] = {}
-        
-        for t in subscriptions:
-            key = t.description
-            if key not in sub_groups:
-                sub_groups[key] = {
-                    'name': t.description,
-                    'total': 0,
-                    'count': 0,
-                    'amounts': [],
-                    'category': t.category
-                }
-            sub_groups[key]['total'] += abs(t.amount)
-            sub_groups[key]['count'] += 1
-            sub_groups[key]['amounts'].append(abs(t.amount))
+        frame = pd.DataFrame({
+            'name': [t.description for t in subscriptions],
+            'amount': [abs(t.amount) for t in subscriptions],
+            'category': [t.category for t in subscriptions],
+        })
+        
+        # Group by description to find unique subscriptions (in order of first appearance)
+        sub_groups = frame.groupby('name', sort=False).agg(
+            total=('amount', 'sum'),
+            count=('amount', 'size'),
+            category=('category', 'first')
+        )
         
         # Calculate typical monthly amount
         subscription_list = []
-        for name, data in sub_groups.items():
-            avg_amount = data['total'] / data['count']
+        for name, group_total, count, category in sub_groups.itertuples():
+            group_total, count = float(group_total), int(count)
+            avg_amount = group_total / count
             subscription_list.append({
                 'name': name,
                 'average_amount': round(avg_amount, 2),
-                'occurrences': data['count'],
-                'total_spent': round(data['total'], 2),
-                'category': data['category']
+                'occurrences': count,
+                'total_spent': round(group_total, 2),
+                'category': category
             })
         
         # Sort by total spent
         subscription_list.sort(key=lambda x: x['total_spent'], reverse=True)
         
-        total = sum(abs(t.amount) for t in subscriptions)
+        total = float(frame['amount'].sum())
         
         return {
             'total': round(total, 2),
@@ -503,52 +637,73 @@ class ExpenseClassifier:
         Returns:
             List of reduction opportunities with potential savings
         """
-        expenses = [t for t in transactions if t.is_expense]
+        dining_keywords = ('restaurant', 'cafe', 'doordash', 'uber eats', 'grubhub')
+        
+        # Accumulate every bucket in a single pass over the expenses
+        sub_total = 0
+        sub_names = set()  # Only tracked until there are enough to flag
+        dining_total = 0
+        ent_total = 0
+        
+        for t in transactions:
+            if not t.is_expense:
+                continue
+            
+            amount = abs(t.amount)
+            category_lower = t.category_lower
+            
+            if t.recurrence == RecurrenceType.SUBSCRIPTION:
+                sub_total += amount
+                if len(sub_names) <= 3:
+                    sub_names.add(t.description)
+            
+            if ('restaurant' in category_lower or 'dining' in category_lower
+                    or any(kw in t.description_lower for kw in dining_keywords)):
+                dining_total += amount
+            
+            if 'entertainment' in category_lower:
+                ent_total += amount
         
         opportunities = []
         
         # 1. Subscriptions
-        subscriptions = [t for t in expenses if t.recurrence == RecurrenceType.SUBSCRIPTION]
-        if subscriptions:
-            sub_total = sum(abs(t.amount) for t in subscriptions)
-            if len(set(t.description for t in subscriptions)) > 3:  # Multiple subscriptions
-                opportunities.append({
-                    'category': 'Subscriptions',
-                    'current': round(sub_total, 2),
-                    'potential_savings': round(sub_total * 0.3, 2),  # Cancel 30%
-                    'suggestion': 'Review and cancel unused subscriptions',
-                    'priority': 'High'
-                })
+        if len(sub_names) > 3:  # Multiple subscriptions
+            opportunities.append({
+                'category': 'Subscriptions',
+                'current': round(sub_total, 2),
+                'potential_savings': round(sub_total * 0.3, 2),  # Cancel 30%
+                'suggestion': 'Review and cancel unused subscriptions',
+                'priority': 'High'
+            })
         
         # 2. Dining out
-        dining = [t for t in expenses if 'restaurant' in t.category.lower() or 'dining' in t.category.lower() 
-                  or any(kw in t.description.lower() for kw in ['restaurant', 'cafe', 'doordash', 'uber eats', 'grubhub'])]
-        if dining:
-            dining_total = sum(abs(t.amount) for t in dining)
-            if dining_total > 200:
-                opportunities.append({
-                    'category': 'Dining Out',
-                    'current': round(dining_total, 2),
-                    'potential_savings': round(dining_total * 0.5, 2),  # Cook more at home
-                    'suggestion': 'Cook more meals at home',
-                    'priority': 'High'
-                })
+        if dining_total > 200:
+            opportunities.append({
+                'category': 'Dining Out',
+                'current': round(dining_total, 2),
+                'potential_savings': round(dining_total * 0.5, 2),  # Cook more at home
+                'suggestion': 'Cook more meals at home',
+                'priority': 'High'
+            })
         
         # 3. Entertainment
-        entertainment = [t for t in expenses if 'entertainment' in t.category.lower()]
-        if entertainment:
-            ent_total = sum(abs(t.amount) for t in entertainment)
-            if ent_total > 100:
-                opportunities.append({
-                    'category': 'Entertainment',
-                    'current': round(ent_total, 2),
-                    'potential_savings': round(ent_total * 0.25, 2),
-                    'suggestion': 'Look for free or low-cost entertainment alternatives',
-                    'priority': 'Low'
-                })
+        if ent_total > 100:
+            opportunities.append({
+                'category': 'Entertainment',
+                'current': round(ent_total, 2),
+                'potential_savings': round(ent_total * 0.25, 2),
+                'suggestion': 'Look for free or low-cost entertainment alternatives',
+                'priority': 'Low'
+            })
         
         # Sort by potential savings
         opportunities.sort(key=lambda x: x['potential_savings'], reverse=True)
         
         return opportunities
 
+
+# Necessity keywords are checked in priority order (savings, needs, wants), so a
+# keyword listed in two of those sets could never reach the later one
+assert ExpenseClassifier.SAVINGS_KEYWORDS.isdisjoint(ExpenseClassifier.ESSENTIAL_KEYWORDS)
+assert ExpenseClassifier.SAVINGS_KEYWORDS.isdisjoint(ExpenseClassifier.DISCRETIONARY_KEYWORDS)
+assert ExpenseClassifier.ESSENTIAL_KEYWORDS.isdisjoint(ExpenseClassifier.DISCRETIONARY_KEYWORDS)
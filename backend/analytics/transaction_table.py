@@ -0,0 +1,75 @@
+"""Columnar (struct-of-arrays) view of transactions for vectorized analytics."""
+from typing import Dict, List, Tuple
+import numpy as np
+from backend.models.transaction import Transaction, NecessityLevel, RecurrenceType
+
+
+class TransactionTable:
+    """
+    Parallel NumPy columns built from a list of transactions.
+
+    Amounts are held as int64 cents; convert back to dollars (/ 100) only
+    when producing results.
+
+    Necessity and recurrence values are stored as small integer codes. The
+    built-in levels always get the same codes; any other value (e.g. a
+    user-defined tag) is assigned the next free code when it is first seen.
+    """
+
+    # Built-in values with fixed codes (index in the list is the code)
+    NECESSITY_LEVELS = [
+        NecessityLevel.NEEDS,
+        NecessityLevel.WANTS,
+        NecessityLevel.SAVINGS,
+        NecessityLevel.FLEXIBLE_NEED,
+        NecessityLevel.UNKNOWN,
+    ]
+    RECURRENCE_TYPES = [
+        RecurrenceType.SUBSCRIPTION,
+        RecurrenceType.RECURRING,
+        RecurrenceType.ONE_TIME,
+        RecurrenceType.UNKNOWN,
+    ]
+
+    def __init__(self, transactions: List[Transaction]):
+        """
+        Build the columns for a list of transactions.
+
+        Args:
+            transactions: List of Transaction objects
+        """
+        count = len(transactions)
+        self.transactions = transactions
+        amounts = np.fromiter((t.amount for t in transactions), dtype=np.float64, count=count)
+        self.is_expense = amounts < 0
+        # Amounts are quantized to whole cents so sums are exact integer adds
+        self.cents = np.rint(amounts * 100).astype(np.int64)
+        self.abs_cents = np.abs(self.cents)
+        self.necessity_labels, self.necessity = self._encode(
+            (t.necessity for t in transactions), self.NECESSITY_LEVELS, count
+        )
+        self.recurrence_labels, self.recurrence = self._encode(
+            (t.recurrence for t in transactions), self.RECURRENCE_TYPES, count
+        )
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    @staticmethod
+    def _encode(values, known: List[str], count: int) -> Tuple[List[str], np.ndarray]:
+        """Map string values to integer codes, returning (labels, codes)."""
+        index: Dict[str, int] = {label: code for code, label in enumerate(known)}
+        codes = np.fromiter(
+            (index.setdefault(str(value), len(index)) for value in values),
+            dtype=np.int16,
+            count=count
+        )
+        return list(index), codes
+
+    def expense_total(self) -> float:
+        """Get the total absolute amount spent across all expenses."""
+        return int(self.abs_cents[self.is_expense].sum()) / 100
+
+    def necessity_code(self, level: str) -> int:
+        """Get the code used for a necessity level."""
+        return self.necessity_labels.index(level)
@@ -1,13 +1,15 @@
 """Main Flask application for Spendsight."""
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, g
 from werkzeug.utils import secure_filename
 import os
 import sys
 import json
 import secrets
 import logging
+from operator import attrgetter
 from pathlib import Path
-from backend.config import Config, BASE_DIR
+import numpy as np
+from backend.config import ALLOWED_EXTENSIONS, Config, BASE_DIR
 
 # Get the logger that was set up in run.py (don't create new handlers)
 logger = logging.getLogger('spendsight')
@@ -21,10 +23,12 @@ from backend.sheets.sheets_client import SheetsClient
 from backend.analytics.categorizer import TransactionCategorizer
 from backend.analytics.insights import InsightsGenerator
 from backend.analytics.expense_classifier import ExpenseClassifier
-from backend.models.category_rule import rule_engine, CategoryRule
-from backend.models.exclusion_rule import exclusion_engine, ExclusionRule
-from backend.models.recurring_expense import recurring_expense_engine, RecurringExpense
-from backend.models.period_notes import period_notes_engine
+from backend.analytics.transaction_table import TransactionTable
+# Rule/expense/note engines load their JSON on first use, via these modules
+from backend.models import category_rule, exclusion_rule, period_notes, recurring_expense
+from backend.models.category_rule import CategoryRule
+from backend.models.exclusion_rule import ExclusionRule
+from backend.models.recurring_expense import RecurringExpense
 
 # Initialize Flask app
 app = Flask(__name__, 
@@ -86,6 +90,7 @@ FLASK_DEBUG=True
 # Upload Configuration
 UPLOAD_FOLDER=data/uploads
 MAX_CONTENT_LENGTH=16777216
+PERSIST_UPLOADS=False
 
 # Port Configuration
 PORT=5000
@@ -97,7 +102,7 @@ PORT=5000
 def allowed_file(filename):
     """Check if file extension is allowed."""
     return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
+           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def is_duplicate_transaction(new_transaction, existing_transactions):
     """Check if a transaction already exists based on date, description, and amount."""
@@ -110,6 +115,23 @@ def is_duplicate_transaction(new_transaction, existing_transactions):
             return True
     return False
 
+def get_transaction_table() -> TransactionTable:
+    """
+    Get the columnar view of all_transactions for the current request.
+    
+    Built at most once per request so the analytics in one view share it.
+    Transactions are edited in place by many routes, so the table is not
+    kept across requests.
+    """
+    if 'transaction_table' not in g:
+        g.transaction_table = TransactionTable(all_transactions)
+    return g.transaction_table
+
+def tag_counts(codes, labels):
+    """Count transactions per tag from an integer-coded column, skipping empty tags."""
+    counts = np.bincount(codes, minlength=len(labels))
+    return {label: int(count) for label, count in zip(labels, counts) if label and count}
+
 def filter_duplicates(new_transactions, existing_transactions):
     """Filter out duplicate transactions and return unique ones with duplicate count."""
     unique_transactions = []
@@ -399,14 +421,19 @@ def api_upload_csv():
             errors.append(f'{file.filename}: Invalid file type')
             continue
         
-        # Save file
-        filename = secure_filename(file.filename)
-        filepath = Config.UPLOAD_FOLDER / filename
-        file.save(str(filepath))
+        if Config.PERSIST_UPLOADS:
+            # Save file
+            filename = secure_filename(file.filename)
+            filepath = Config.UPLOAD_FOLDER / filename
+            file.save(str(filepath))
+            source = str(filepath)
+        else:
+            # Parse straight from the uploaded stream, skipping the disk round-trip
+            source = file.stream
         
         try:
             # Auto-detect CSV type from columns
-            csv_type, confidence, has_categories = CSVDetector.detect(str(filepath))
+            csv_type, confidence, has_categories = CSVDetector.detect(source)
             format_info = CSVDetector.get_format_info(csv_type)
             
             if csv_type == CSVType.UNKNOWN:
@@ -420,11 +447,12 @@ def api_upload_csv():
             if use_csv_categories and not has_categories:
                 use_csv_categories = False
             
-            # Parse based on detected type
+            # Parse based on detected type - rows are classified as they stream
+            # into the duplicate filter, without building an intermediate list
             if csv_type == CSVType.CHASE_CREDIT or csv_type == CSVType.CHASE_DEBIT:
-                transactions = ChaseParser.parse(str(filepath), use_csv_categories=use_csv_categories)
+                transactions = ChaseParser.parse_iter(source, use_csv_categories=use_csv_categories)
             else:  # DISCOVER
-                transactions = DiscoverParser.parse(str(filepath), use_csv_categories=use_csv_categories)
+                transactions = DiscoverParser.parse_iter(source, use_csv_categories=use_csv_categories)
             
             # Filter out duplicate transactions
             unique_transactions, duplicate_count = filter_duplicates(
@@ -434,11 +462,11 @@ def api_upload_csv():
             total_duplicates += duplicate_count
             
             # Apply sweep/exclusion rules
-            unique_transactions, swept_count = exclusion_engine.filter_new_transactions(unique_transactions)
+            unique_transactions, swept_count = exclusion_rule.exclusion_engine.filter_new_transactions(unique_transactions)
             total_swept += swept_count
             
             # Apply category rules
-            rules_updated = rule_engine.apply_to_all(unique_transactions)
+            rules_updated = category_rule.rule_engine.apply_to_all(unique_transactions)
             total_rules_updated += rules_updated
             
             # Collect for batch processing
@@ -513,7 +541,8 @@ def api_sheets_status():
                 'has_data': data_count > 0,
                 'data_count': data_count
             })
-        except:
+        except Exception as e:
+            sheets_client.discard_connection_on_error(e)
             return jsonify({
                 'connected': True,
                 'has_data': False,
@@ -553,12 +582,13 @@ def index():
     spending_by_bank = TransactionCategorizer.spending_by_bank(all_transactions)
     statistics = TransactionCategorizer.get_statistics(all_transactions)
     
-    # Enhanced classification data
-    budget_health = ExpenseClassifier.get_budget_health(all_transactions)
-    classification = ExpenseClassifier.analyze_by_dimension(all_transactions)
+    # Enhanced classification data (both analyses share one columnar table)
+    table = get_transaction_table()
+    budget_health = ExpenseClassifier.get_budget_health(all_transactions, table=table)
+    classification = ExpenseClassifier.analyze_by_dimension(all_transactions, table=table)
     
     # Calculate totals
-    total_spent = sum(abs(t.amount) for t in all_transactions if t.is_expense)
+    total_spent = table.expense_total()
     total_income = sum(t.amount for t in all_transactions if t.is_income)
     
     return render_template('index.html',
@@ -607,14 +637,19 @@ def upload():
                 flash(f'Skipped {file.filename}: Invalid file type. Only CSV files are allowed.', 'warning')
                 continue
             
-            # Save file
-            filename = secure_filename(file.filename)
-            filepath = Config.UPLOAD_FOLDER / filename
-            file.save(str(filepath))
+            if Config.PERSIST_UPLOADS:
+                # Save file
+                filename = secure_filename(file.filename)
+                filepath = Config.UPLOAD_FOLDER / filename
+                file.save(str(filepath))
+                source = str(filepath)
+            else:
+                # Parse straight from the uploaded stream, skipping the disk round-trip
+                source = file.stream
             
             try:
                 # Auto-detect CSV type from columns
-                csv_type, confidence, has_categories = CSVDetector.detect(str(filepath))
+                csv_type, confidence, has_categories = CSVDetector.detect(source)
                 format_info = CSVDetector.get_format_info(csv_type)
                 
                 if csv_type == CSVType.UNKNOWN:
@@ -628,11 +663,12 @@ def upload():
                 if use_csv_categories and not has_categories:
                     use_csv_categories = False
                 
-                # Parse based on detected type
+                # Parse based on detected type - rows are classified as they stream
+                # into the duplicate filter, without building an intermediate list
                 if csv_type == CSVType.CHASE_CREDIT or csv_type == CSVType.CHASE_DEBIT:
-                    transactions = ChaseParser.parse(str(filepath), use_csv_categories=use_csv_categories)
+                    transactions = ChaseParser.parse_iter(source, use_csv_categories=use_csv_categories)
                 else:  # DISCOVER
-                    transactions = DiscoverParser.parse(str(filepath), use_csv_categories=use_csv_categories)
+                    transactions = DiscoverParser.parse_iter(source, use_csv_categories=use_csv_categories)
                 
                 # Filter out duplicate transactions (check against existing + already added in this batch)
                 unique_transactions, duplicate_count = filter_duplicates(
@@ -642,11 +678,11 @@ def upload():
                 total_duplicates += duplicate_count
                 
                 # Apply sweep/exclusion rules to filter out unwanted transactions
-                unique_transactions, swept_count = exclusion_engine.filter_new_transactions(unique_transactions)
+                unique_transactions, swept_count = exclusion_rule.exclusion_engine.filter_new_transactions(unique_transactions)
                 total_swept += swept_count
                 
                 # Apply category rules to new transactions
-                rules_updated = rule_engine.apply_to_all(unique_transactions)
+                rules_updated = category_rule.rule_engine.apply_to_all(unique_transactions)
                 total_rules_updated += rules_updated
                 
                 # Collect for batch processing
@@ -804,13 +840,13 @@ def api_chart_data():
 @app.route('/api/classification')
 def api_classification():
     """API endpoint for multi-dimensional expense classification analysis."""
-    analysis = ExpenseClassifier.analyze_by_dimension(all_transactions)
+    analysis = ExpenseClassifier.analyze_by_dimension(all_transactions, table=get_transaction_table())
     return jsonify(analysis)
 
 @app.route('/api/budget-health')
 def api_budget_health():
     """API endpoint for 50/30/20 budget health analysis."""
-    health = ExpenseClassifier.get_budget_health(all_transactions)
+    health = ExpenseClassifier.get_budget_health(all_transactions, table=get_transaction_table())
     return jsonify(health)
 
 @app.route('/api/subscriptions')
@@ -828,7 +864,7 @@ def api_reduction_opportunities():
 @app.route('/api/necessity')
 def api_necessity():
     """API endpoint for needs vs wants vs savings breakdown."""
-    analysis = ExpenseClassifier.analyze_by_dimension(all_transactions)
+    analysis = ExpenseClassifier.analyze_by_dimension(all_transactions, table=get_transaction_table())
     return jsonify(analysis.get('by_necessity', {}))
 
 @app.route('/api/transactions/filter')
@@ -882,15 +918,15 @@ def api_transactions_filter():
     
     # Filter by necessity (single or multiple)
     if necessity:
-        filtered = [t for t in filtered if getattr(t, 'necessity', 'Unknown') == necessity]
+        filtered = [t for t in filtered if t.necessity == necessity]
     elif necessities:
-        filtered = [t for t in filtered if getattr(t, 'necessity', 'Unknown') in necessities]
+        filtered = [t for t in filtered if t.necessity in necessities]
     
     # Filter by recurrence (single or multiple)
     if recurrence:
-        filtered = [t for t in filtered if getattr(t, 'recurrence', 'One-time') == recurrence]
+        filtered = [t for t in filtered if t.recurrence == recurrence]
     elif recurrences:
-        filtered = [t for t in filtered if getattr(t, 'recurrence', 'One-time') in recurrences]
+        filtered = [t for t in filtered if t.recurrence in recurrences]
     
     # Filter by period type
     if period_type and period_value:
@@ -938,12 +974,12 @@ def api_transactions_filter():
         # Filter for transactions with Unknown necessity, excluding Income category
         # (Income transactions don't have necessity by design)
         filtered = [t for t in filtered if 
-                    getattr(t, 'necessity', 'Unknown') == 'Unknown' and 
+                    t.necessity == 'Unknown' and 
                     t.category.lower() != 'income']
     
     if untagged_recurrence:
         # Filter for transactions with Unknown recurrence
-        filtered = [t for t in filtered if getattr(t, 'recurrence', 'Unknown') == 'Unknown']
+        filtered = [t for t in filtered if t.recurrence == 'Unknown']
     
     # Sort by date descending
     filtered.sort(key=lambda t: t.transaction_date, reverse=True)
@@ -971,7 +1007,7 @@ def api_transactions_filter():
 @app.route('/api/category-rules', methods=['GET'])
 def api_get_category_rules():
     """Get all category rules."""
-    rules = rule_engine.get_all_rules()
+    rules = category_rule.rule_engine.get_all_rules()
     return jsonify({
         'rules': [r.to_dict() for r in rules]
     })
@@ -1026,10 +1062,10 @@ def api_create_category_rule():
     first_value = tags[first_field]
     
     # Create the rule with tags
-    rule = rule_engine.add_rule(first_value, keywords, priority, first_field, tags)
+    rule = category_rule.rule_engine.add_rule(first_value, keywords, priority, first_field, tags)
     
     # Apply rule to all existing transactions
-    updated_count = rule_engine.apply_single_rule(rule, all_transactions)
+    updated_count = category_rule.rule_engine.apply_single_rule(rule, all_transactions)
     
     return jsonify({
         'success': True,
@@ -1056,13 +1092,13 @@ def api_update_category_rule(rule_id):
         if len(keywords) == 0:
             return jsonify({'error': 'At least one non-empty keyword is required'}), 400
     
-    rule = rule_engine.update_rule(rule_id, category, keywords, priority, enabled)
+    rule = category_rule.rule_engine.update_rule(rule_id, category, keywords, priority, enabled)
     
     if not rule:
         return jsonify({'error': 'Rule not found'}), 404
     
     # Re-apply all rules to all transactions
-    rule_engine.apply_to_all(all_transactions)
+    category_rule.rule_engine.apply_to_all(all_transactions)
     
     return jsonify({
         'success': True,
@@ -1072,7 +1108,7 @@ def api_update_category_rule(rule_id):
 @app.route('/api/category-rules/<rule_id>', methods=['DELETE'])
 def api_delete_category_rule(rule_id):
     """Delete a category rule."""
-    success = rule_engine.delete_rule(rule_id)
+    success = category_rule.rule_engine.delete_rule(rule_id)
     
     if not success:
         return jsonify({'error': 'Rule not found'}), 404
@@ -1082,7 +1118,7 @@ def api_delete_category_rule(rule_id):
 @app.route('/api/category-rules/apply-all', methods=['POST'])
 def api_apply_all_rules():
     """Re-apply all category rules to all transactions."""
-    updated_count = rule_engine.apply_to_all(all_transactions)
+    updated_count = category_rule.rule_engine.apply_to_all(all_transactions)
     return jsonify({
         'success': True,
         'transactions_updated': updated_count
@@ -1110,7 +1146,7 @@ def api_preview_rule():
     # Find matching transactions
     matches = []
     for t in all_transactions:
-        desc_lower = t.description.lower()
+        desc_lower = t.description_lower
         if all(kw in desc_lower for kw in keywords):
             matches.append({
                 'description': t.description,
@@ -1132,7 +1168,7 @@ def api_preview_rule():
 @app.route('/api/sweep-rules', methods=['GET'])
 def api_get_sweep_rules():
     """Get all sweep/exclusion rules."""
-    rules = exclusion_engine.get_all_rules()
+    rules = exclusion_rule.exclusion_engine.get_all_rules()
     return jsonify({
         'rules': [r.to_dict() for r in rules]
     })
@@ -1160,10 +1196,10 @@ def api_create_sweep_rule():
         return jsonify({'error': 'At least one valid keyword is required'}), 400
     
     # Create the rule with title
-    rule = exclusion_engine.add_rule(keywords, title=title)
+    rule = exclusion_rule.exclusion_engine.add_rule(keywords, title=title)
     
     # Apply to existing transactions (sweep them away)
-    all_transactions, swept_count = exclusion_engine.sweep_transactions(all_transactions)
+    all_transactions, swept_count = exclusion_rule.exclusion_engine.sweep_transactions(all_transactions)
     
     return jsonify({
         'success': True,
@@ -1193,7 +1229,7 @@ def api_join_sweep_rules():
     if not rule_ids or len(rule_ids) < 2:
         return jsonify({'error': 'At least 2 rules are required to join'}), 400
     
-    joined_rule = exclusion_engine.join_rules(rule_ids, title)
+    joined_rule = exclusion_rule.exclusion_engine.join_rules(rule_ids, title)
     
     if not joined_rule:
         return jsonify({'error': 'Could not join rules. Make sure the rules exist and are enabled.'}), 400
@@ -1223,7 +1259,7 @@ def api_preview_sweep_rule():
     if len(keywords) == 0:
         return jsonify({'match_count': 0, 'sample_matches': []})
     
-    count, matches = exclusion_engine.count_matches(keywords, all_transactions)
+    count, matches = exclusion_rule.exclusion_engine.count_matches(keywords, all_transactions)
     
     return jsonify({
         'match_count': count,
@@ -1235,7 +1271,7 @@ def api_apply_all_sweep_rules():
     """Re-apply all sweep rules to all transactions."""
     global all_transactions
     
-    all_transactions, swept_count = exclusion_engine.sweep_transactions(all_transactions)
+    all_transactions, swept_count = exclusion_rule.exclusion_engine.sweep_transactions(all_transactions)
     
     return jsonify({
         'success': True,
@@ -1254,7 +1290,7 @@ def api_update_sweep_rule(rule_id):
     keywords = data.get('keywords')
     enabled = data.get('enabled')
     
-    rule = exclusion_engine.update_rule(
+    rule = exclusion_rule.exclusion_engine.update_rule(
         rule_id,
         keywords=keywords,
         enabled=enabled
@@ -1271,7 +1307,7 @@ def api_update_sweep_rule(rule_id):
 @app.route('/api/sweep-rules/<rule_id>', methods=['DELETE'])
 def api_delete_sweep_rule(rule_id):
     """Delete a sweep rule."""
-    success = exclusion_engine.delete_rule(rule_id)
+    success = exclusion_rule.exclusion_engine.delete_rule(rule_id)
     
     if not success:
         return jsonify({'error': 'Rule not found'}), 404
@@ -1287,8 +1323,8 @@ def api_delete_sweep_rule(rule_id):
 def api_export_rules():
     """Export all auto-tag rules and sweep rules as JSON."""
     try:
-        category_rules = rule_engine.get_all_rules()
-        sweep_rules = exclusion_engine.get_all_rules()
+        category_rules = category_rule.rule_engine.get_all_rules()
+        sweep_rules = exclusion_rule.exclusion_engine.get_all_rules()
         
         export_data = {
             'version': '1.0',
@@ -1317,7 +1353,7 @@ def api_import_rules():
         
         # Import auto-tag rules
         auto_tag_rules = data.get('auto_tag_rules', [])
-        existing_tag_keywords = {tuple(sorted(r.keywords)) for r in rule_engine.get_all_rules()}
+        existing_tag_keywords = {tuple(sorted(r.keywords)) for r in category_rule.rule_engine.get_all_rules()}
         
         for rule_data in auto_tag_rules:
             # Check for duplicate by keywords
@@ -1334,7 +1370,7 @@ def api_import_rules():
             if tags and rule_data.get('keywords'):
                 first_field = list(tags.keys())[0]
                 first_value = tags[first_field]
-                rule_engine.add_rule(
+                category_rule.rule_engine.add_rule(
                     category=first_value,
                     keywords=rule_data.get('keywords', []),
                     priority=rule_data.get('priority', 0),
@@ -1346,22 +1382,30 @@ def api_import_rules():
         
         # Import sweep rules
         sweep_rules = data.get('sweep_rules', [])
-        existing_sweep_keywords = {tuple(sorted(r.keywords)) for r in exclusion_engine.get_all_rules()}
+        existing_sweep_keywords = {
+            (tuple(sorted(r.keywords)), tuple(map(tuple, r.or_groups)))
+            for r in exclusion_rule.exclusion_engine.get_all_rules()
+        }
         
-        for rule_data in sweep_rules:
-            # Check for duplicate by keywords
-            rule_keywords = tuple(sorted(rule_data.get('keywords', [])))
-            if rule_keywords in existing_sweep_keywords:
-                skipped_duplicates += 1
-                continue
-            
-            if rule_data.get('keywords'):
-                exclusion_engine.add_rule(
-                    keywords=rule_data.get('keywords', []),
-                    title=rule_data.get('title', '')
+        with exclusion_rule.exclusion_engine.bulk():
+            for rule_data in sweep_rules:
+                # Check for duplicate by keywords
+                rule_keywords = (
+                    tuple(sorted(rule_data.get('keywords', []))),
+                    tuple(map(tuple, rule_data.get('or_groups', [])))
                 )
-                existing_sweep_keywords.add(rule_keywords)
-                imported_sweep_rules += 1
+                if rule_keywords in existing_sweep_keywords:
+                    skipped_duplicates += 1
+                    continue
+                
+                if rule_data.get('keywords'):
+                    exclusion_rule.exclusion_engine.add_rule(
+                        keywords=rule_data.get('keywords', []),
+                        title=rule_data.get('title', ''),
+                        or_groups=rule_data.get('or_groups')
+                    )
+                    existing_sweep_keywords.add(rule_keywords)
+                    imported_sweep_rules += 1
         
         return jsonify({
             'success': True,
@@ -1563,7 +1607,7 @@ def api_sync_to_sheets():
         sheets_client.create_monthly_summary(all_transactions)
         
         # Sync period notes (weekly/monthly analysis) to Google Sheets
-        all_notes = period_notes_engine.get_all_notes()
+        all_notes = period_notes.period_notes_engine.get_all_notes()
         notes_result = sheets_client.sync_period_notes(all_notes)
         notes_synced = notes_result.get('synced_count', 0) if notes_result.get('success') else 0
         
@@ -1612,7 +1656,7 @@ def api_apply_rules_to_sheets():
             })
         
         # Apply all category rules to the loaded transactions
-        updated_count = rule_engine.apply_to_all(sheet_transactions)
+        updated_count = category_rule.rule_engine.apply_to_all(sheet_transactions)
         
         # Sync the updated transactions back to Google Sheets
         sync_result = sheets_client.sync_transactions(sheet_transactions, clear_first=True)
@@ -1669,7 +1713,7 @@ def api_apply_sweep_to_sheets():
         original_count = len(sheet_transactions)
         
         # Apply all sweep rules to remove matching transactions
-        remaining_transactions, swept_count = exclusion_engine.sweep_transactions(sheet_transactions)
+        remaining_transactions, swept_count = exclusion_rule.exclusion_engine.sweep_transactions(sheet_transactions)
         
         # Sync the filtered transactions back to Google Sheets
         sync_result = sheets_client.sync_transactions(remaining_transactions, clear_first=True)
@@ -1728,11 +1772,11 @@ def api_budget_data():
     total_spent = sum(abs(t.amount) for t in expenses)
     
     # Calculate recurring expenses (Subscription + Recurring)
-    recurring_expenses = [t for t in expenses if getattr(t, 'recurrence', 'One-time') in ['Subscription', 'Recurring']]
+    recurring_expenses = [t for t in expenses if t.recurrence in ['Subscription', 'Recurring']]
     recurring_total = sum(abs(t.amount) for t in recurring_expenses)
     
     # Calculate needs expenses
-    needs_expenses = [t for t in expenses if getattr(t, 'necessity', 'Unknown') == 'Needs']
+    needs_expenses = [t for t in expenses if t.necessity == 'Needs']
     needs_total = sum(abs(t.amount) for t in needs_expenses)
     
     # Build expense list with all needed info
@@ -1744,10 +1788,10 @@ def api_budget_data():
             'date': t.transaction_date.strftime('%b %d'),
             'fullDate': t.transaction_date.strftime('%Y-%m-%d'),
             'category': t.category,
-            'bank': getattr(t, 'bank', ''),
-            'necessity': getattr(t, 'necessity', 'Unknown'),
-            'recurrence': getattr(t, 'recurrence', 'One-time'),
-            'note': getattr(t, 'note', '')
+            'bank': t.bank,
+            'necessity': t.necessity,
+            'recurrence': t.recurrence,
+            'note': t.note
         })
     
     return jsonify({
@@ -1768,8 +1812,8 @@ def api_budget_data():
 @app.route('/api/recurring-expenses', methods=['GET'])
 def api_get_recurring_expenses():
     """Get all recurring expenses."""
-    expenses = recurring_expense_engine.get_all_expenses()
-    totals = recurring_expense_engine.get_totals_by_frequency()
+    expenses = recurring_expense.recurring_expense_engine.get_all_expenses()
+    totals = recurring_expense.recurring_expense_engine.get_totals_by_frequency()
     
     return jsonify({
         'expenses': [e.to_dict() for e in expenses],
@@ -1810,7 +1854,7 @@ def api_create_recurring_expense():
         keywords = [k.strip() for k in keywords if k.strip()]
     
     # Create the expense
-    expense = recurring_expense_engine.add_expense(
+    expense = recurring_expense.recurring_expense_engine.add_expense(
         name=name,
         amount=amount,
         frequency=frequency,
@@ -1821,7 +1865,7 @@ def api_create_recurring_expense():
     # If keywords provided, link to existing transactions
     linked_count = 0
     if keywords:
-        linked_count = recurring_expense_engine.link_to_transactions(expense, all_transactions)
+        linked_count = recurring_expense.recurring_expense_engine.link_to_transactions(expense, all_transactions)
     
     return jsonify({
         'success': True,
@@ -1856,7 +1900,7 @@ def api_update_recurring_expense(expense_id):
     if keywords is not None:
         keywords = [k.strip() for k in keywords if k.strip()]
     
-    expense = recurring_expense_engine.update_expense(
+    expense = recurring_expense.recurring_expense_engine.update_expense(
         expense_id,
         name=name,
         amount=amount,
@@ -1872,7 +1916,7 @@ def api_update_recurring_expense(expense_id):
     # Re-link to transactions if keywords changed
     linked_count = 0
     if keywords is not None and expense.keywords:
-        linked_count = recurring_expense_engine.link_to_transactions(expense, all_transactions)
+        linked_count = recurring_expense.recurring_expense_engine.link_to_transactions(expense, all_transactions)
     
     return jsonify({
         'success': True,
@@ -1884,7 +1928,7 @@ def api_update_recurring_expense(expense_id):
 @app.route('/api/recurring-expenses/<expense_id>', methods=['DELETE'])
 def api_delete_recurring_expense(expense_id):
     """Delete a recurring expense."""
-    success = recurring_expense_engine.delete_expense(expense_id)
+    success = recurring_expense.recurring_expense_engine.delete_expense(expense_id)
     
     if not success:
         return jsonify({'error': 'Expense not found'}), 404
@@ -1911,7 +1955,7 @@ def api_preview_recurring_expense():
     if not keywords:
         return jsonify({'count': 0, 'samples': []})
     
-    result = recurring_expense_engine.preview_matches(keywords, all_transactions)
+    result = recurring_expense.recurring_expense_engine.preview_matches(keywords, all_transactions)
     
     return jsonify(result)
 
@@ -1919,7 +1963,7 @@ def api_preview_recurring_expense():
 @app.route('/api/recurring-expenses/link-all', methods=['POST'])
 def api_link_all_recurring_expenses():
     """Link all recurring expenses to matching transactions."""
-    linked_count = recurring_expense_engine.link_all_expenses(all_transactions)
+    linked_count = recurring_expense.recurring_expense_engine.link_all_expenses(all_transactions)
     
     return jsonify({
         'success': True,
@@ -2031,17 +2075,12 @@ def api_get_all_tag_values():
     """Get all unique categories, necessities, recurrences used in transactions with counts."""
     from collections import Counter
     
-    categories = Counter()
-    necessities = Counter()
-    recurrences = Counter()
+    categories = Counter(t.category for t in all_transactions if t.category)
     
-    for t in all_transactions:
-        if t.category:
-            categories[t.category] += 1
-        if hasattr(t, 'necessity') and t.necessity:
-            necessities[t.necessity] += 1
-        if hasattr(t, 'recurrence') and t.recurrence:
-            recurrences[t.recurrence] += 1
+    # Necessity and recurrence are already integer-coded in the transaction table
+    table = get_transaction_table()
+    necessities = tag_counts(table.necessity, table.necessity_labels)
+    recurrences = tag_counts(table.recurrence, table.recurrence_labels)
     
     return jsonify({
         'categories': [{'name': k, 'count': v} for k, v in sorted(categories.items())],
@@ -2079,15 +2118,16 @@ def api_rename_tag():
     rules_updated = 0
     
     # Update all transactions
+    get_field = attrgetter(field)
     for t in all_transactions:
-        if hasattr(t, field) and getattr(t, field) == old_value:
+        if get_field(t) == old_value:
             setattr(t, field, new_value)
             transactions_updated += 1
     
     # Update category rules if the field matches
-    for rule in rule_engine.get_all_rules():
+    for rule in category_rule.rule_engine.get_all_rules():
         if rule.field == field and rule.category == old_value:
-            rule_engine.update_rule(rule.id, category=new_value)
+            category_rule.rule_engine.update_rule(rule.id, category=new_value)
             rules_updated += 1
     
     return jsonify({
@@ -2156,8 +2196,9 @@ def api_delete_tag():
     transactions_updated = 0
     
     # Update all transactions with this value
+    get_field = attrgetter(field)
     for t in all_transactions:
-        if hasattr(t, field) and getattr(t, field) == value:
+        if get_field(t) == value:
             setattr(t, field, default)
             transactions_updated += 1
     
@@ -2230,7 +2271,7 @@ def api_sync_diagnostics():
 @app.route('/api/period-notes/<period_key>', methods=['GET'])
 def api_get_period_note(period_key):
     """Get the personal analysis note for a specific period."""
-    content = period_notes_engine.get_note(period_key)
+    content = period_notes.period_notes_engine.get_note(period_key)
     return jsonify({
         'period_key': period_key,
         'content': content
@@ -2248,7 +2289,7 @@ def api_save_period_note(period_key):
     content = data.get('content', '')
     
     # Save the note
-    note = period_notes_engine.save_note(period_key, content)
+    note = period_notes.period_notes_engine.save_note(period_key, content)
     
     return jsonify({
         'success': True,
@@ -2260,7 +2301,7 @@ def api_save_period_note(period_key):
 @app.route('/api/period-notes/<period_key>', methods=['DELETE'])
 def api_delete_period_note(period_key):
     """Delete the personal analysis note for a specific period."""
-    success = period_notes_engine.delete_note(period_key)
+    success = period_notes.period_notes_engine.delete_note(period_key)
     
     return jsonify({
         'success': success,
@@ -2271,7 +2312,7 @@ def api_delete_period_note(period_key):
 @app.route('/api/period-notes', methods=['GET'])
 def api_get_all_period_notes():
     """Get all personal analysis notes."""
-    notes = period_notes_engine.get_all_notes()
+    notes = period_notes.period_notes_engine.get_all_notes()
     return jsonify({
         'notes': notes
     })
@@ -2281,7 +2322,7 @@ def api_get_all_period_notes():
 def api_export_period_notes():
     """Export all personal analysis notes as JSON."""
     try:
-        notes = period_notes_engine.get_all_notes()
+        notes = period_notes.period_notes_engine.get_all_notes()
         
         # Convert to list format for export
         notes_list = [
@@ -2327,13 +2368,13 @@ def api_import_period_notes():
                 continue
             
             # Check if note already exists
-            existing = period_notes_engine.get_note(period_key)
+            existing = period_notes.period_notes_engine.get_note(period_key)
             if existing and existing.strip():
                 # Don't overwrite existing notes
                 skipped_count += 1
                 continue
             
-            period_notes_engine.save_note(period_key, content)
+            period_notes.period_notes_engine.save_note(period_key, content)
             imported_count += 1
         
         return jsonify({
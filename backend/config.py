@@ -2,39 +2,88 @@
 import os
 import sys
 from pathlib import Path
-from dotenv import load_dotenv
+from dotenv import dotenv_values
 
 # Base directory
 # When running from source: project root (two levels up from this file)
 # When running as a PyInstaller executable: directory containing the .exe
 if getattr(sys, "frozen", False):
     # PyInstaller onefile/onedir executable
-    BASE_DIR = Path(sys.executable).resolve().parent
+    BASE_DIR = Path(os.path.dirname(os.path.abspath(sys.executable)))
 else:
-    BASE_DIR = Path(__file__).resolve().parent.parent
+    BASE_DIR = Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (mtime_ns, size, override) of the .env file as last loaded
+_DOTENV_KEY = None
+
+
+def _load_dotenv_cached(override: bool = False):
+    """Load .env into os.environ, skipping the parse if the file is unchanged."""
+    global _DOTENV_KEY
+    path = BASE_DIR / ".env"
+    try:
+        stat = path.stat()
+    except OSError:
+        return  # No .env file (yet)
+    key = (stat.st_mtime_ns, stat.st_size, override)
+    if key == _DOTENV_KEY:
+        return
+    
+    values = dotenv_values(path)
+    for name, value in values.items():
+        if value is None or (name in os.environ and not override):
+            continue
+        if os.environ.get(name) != value:
+            os.environ[name] = value
+    _DOTENV_KEY = key
+
 
 # Load environment variables from .env in the base directory
-load_dotenv(BASE_DIR / ".env")
+_load_dotenv_cached()
+
+# Fixed settings
+ALLOWED_EXTENSIONS = frozenset({'csv'})
+
+
+def _read_settings() -> dict:
+    """Read the environment-dependent settings."""
+    return {
+        # Flask
+        'SECRET_KEY': os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production'),
+        'DEBUG': os.getenv('FLASK_DEBUG', 'True').lower() == 'true',
+        'ENV': os.getenv('FLASK_ENV', 'development'),
+        
+        # Upload settings
+        'UPLOAD_FOLDER': BASE_DIR / os.getenv('UPLOAD_FOLDER', 'data/uploads'),
+        'MAX_CONTENT_LENGTH': int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024)),  # 16MB
+        'PERSIST_UPLOADS': os.getenv('PERSIST_UPLOADS', 'False').lower() == 'true',  # Keep a copy of uploaded CSVs
+        
+        # Google Sheets
+        'GOOGLE_SHEETS_ID': os.getenv('GOOGLE_SHEETS_ID', ''),
+        'GOOGLE_CREDENTIALS_PATH': BASE_DIR / os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json'),
+        
+        # Port
+        'PORT': int(os.getenv('PORT', 5000)),
+    }
+
+
+def _apply_settings():
+    """Publish the current settings as module-level names and Config attributes."""
+    settings = _read_settings()
+    globals().update(settings)
+    for name, value in settings.items():
+        setattr(Config, name, value)
+
 
 class Config:
-    """Application configuration."""
-    
-    # Flask
-    SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
-    DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
-    ENV = os.getenv('FLASK_ENV', 'development')
+    """
+    Application configuration.
     
-    # Upload settings
-    UPLOAD_FOLDER = BASE_DIR / os.getenv('UPLOAD_FOLDER', 'data/uploads')
-    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
-    ALLOWED_EXTENSIONS = {'csv'}
+    The settings are also available as module-level names (e.g.
+    backend.config.PERSIST_UPLOADS); both are refreshed by reload().
+    """
     
-    # Google Sheets
-    GOOGLE_SHEETS_ID = os.getenv('GOOGLE_SHEETS_ID', '')
-    GOOGLE_CREDENTIALS_PATH = BASE_DIR / os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json')
-    
-    # Port
-    PORT = int(os.getenv('PORT', 5000))
+    ALLOWED_EXTENSIONS = ALLOWED_EXTENSIONS
     
     # Ensure directories exist
     @staticmethod
@@ -51,20 +100,15 @@ class Config:
         allowing the app to pick up the new config immediately.
         """
         # Reload environment variables from .env
-        load_dotenv(BASE_DIR / ".env", override=True)
+        _load_dotenv_cached(override=True)
         
-        # Update class attributes with new values
-        cls.SECRET_KEY = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key-change-in-production')
-        cls.DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
-        cls.ENV = os.getenv('FLASK_ENV', 'development')
-        cls.UPLOAD_FOLDER = BASE_DIR / os.getenv('UPLOAD_FOLDER', 'data/uploads')
-        cls.MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
-        cls.GOOGLE_SHEETS_ID = os.getenv('GOOGLE_SHEETS_ID', '')
-        cls.GOOGLE_CREDENTIALS_PATH = BASE_DIR / os.getenv('GOOGLE_CREDENTIALS_PATH', 'credentials.json')
-        cls.PORT = int(os.getenv('PORT', 5000))
+        # Update module names and class attributes with new values
+        _apply_settings()
         
         # Ensure directories exist
         cls.init_app()
         
         return True
 
+
+_apply_settings()
@@ -1,12 +1,14 @@
 """Category rule model for keyword-based auto-tagging."""
 from dataclasses import dataclass, field as dataclass_field
-from typing import List, Dict, Optional
-import json
+from typing import List, Dict, Optional, Tuple
+import sys
 from pathlib import Path
 import uuid
 
+from backend.models.storage import dumps_json, loads_json, write_atomic
 
-@dataclass
+
+@dataclass(slots=True)
 class CategoryRule:
     """
     Represents a rule for auto-categorizing transactions based on keywords.
@@ -24,6 +26,18 @@ class CategoryRule:
     field: str = 'category'  # Which field to update (legacy, used for backward compatibility)
     tags: Dict[str, str] = dataclass_field(default_factory=dict)  # Multiple field:value pairs, e.g., {'category': 'Hobby', 'necessity': 'Wants', 'recurrence': 'Subscription'}
     
+    # Lowercased keywords (refreshed when keywords is reassigned)
+    _keywords_key: Optional[List[str]] = dataclass_field(default=None, init=False, repr=False, compare=False)
+    _keywords_lower: Tuple[str, ...] = dataclass_field(default=(), init=False, repr=False, compare=False)
+    
+    @property
+    def keywords_lower(self) -> Tuple[str, ...]:
+        """Get the lowercased (interned) keywords, computed once per keywords list."""
+        if self._keywords_key is not self.keywords:
+            self._keywords_key = self.keywords
+            self._keywords_lower = tuple(sys.intern(keyword.lower()) for keyword in self.keywords)
+        return self._keywords_lower
+    
     def matches(self, description: str) -> bool:
         """
         Check if this rule matches the given description.
@@ -37,11 +51,14 @@ class CategoryRule:
         Returns:
             True if all keywords are found in the description
         """
+        return self.matches_lower(description.lower())
+    
+    def matches_lower(self, desc_lower: str) -> bool:
+        """Check if this rule matches an already-lowercased description."""
         if not self.enabled:
             return False
         
-        desc_lower = description.lower()
-        return all(keyword.lower() in desc_lower for keyword in self.keywords)
+        return all(keyword in desc_lower for keyword in self.keywords_lower)
     
     def to_dict(self) -> dict:
         """Convert rule to dictionary."""
@@ -89,14 +106,17 @@ class CategoryRuleEngine:
         """
         self.rules: List[CategoryRule] = []
         self.storage_path = storage_path or Path(__file__).resolve().parent.parent.parent / 'data' / 'category_rules.json'
+        self._last_saved_bytes = None  # Contents of the storage file as last read/written
         self._load_rules()
     
     def _load_rules(self):
         """Load rules from storage file."""
         if self.storage_path.exists():
             try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.storage_path, 'rb') as f:
+                    raw = f.read()
+                    data = loads_json(raw)
+                    self._last_saved_bytes = raw
                     self.rules = [CategoryRule.from_dict(r) for r in data.get('rules', [])]
             except Exception as e:
                 print(f"Error loading category rules: {e}")
@@ -107,13 +127,13 @@ class CategoryRuleEngine:
     def _save_rules(self):
         """Save rules to storage file."""
         try:
-            # Ensure data directory exists
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'rules': [r.to_dict() for r in self.rules]
-                }, f, indent=2)
+            payload = dumps_json({
+                'rules': [r.to_dict() for r in self.rules]
+            })
+            if payload == self._last_saved_bytes:
+                return  # Nothing changed since the last save
+            write_atomic(self.storage_path, payload)
+            self._last_saved_bytes = payload
         except Exception as e:
             print(f"Error saving category rules: {e}")
     
@@ -222,8 +242,9 @@ class CategoryRuleEngine:
         Returns:
             The category from the matching rule, or None if no match
         """
+        desc_lower = description.lower()
         for rule in self.rules:
-            if rule.matches(description):
+            if rule.matches_lower(desc_lower):
                 return rule.category
         return None
     
@@ -241,8 +262,9 @@ class CategoryRuleEngine:
             True if any field was updated, False otherwise
         """
         updated = False
+        desc_lower = transaction.description_lower
         for rule in self.rules:
-            if rule.matches(transaction.description):
+            if rule.matches_lower(desc_lower):
                 # Apply all tags from the rule
                 tags = rule.tags if rule.tags else {rule.field or 'category': rule.category}
                 for field, value in tags.items():
@@ -285,7 +307,7 @@ class CategoryRuleEngine:
         tags = rule.tags if rule.tags else {rule.field or 'category': rule.category}
         
         for transaction in transactions:
-            if rule.matches(transaction.description):
+            if rule.matches_lower(transaction.description_lower):
                 transaction_updated = False
                 for field, value in tags.items():
                     if hasattr(transaction, field) and value:
@@ -296,6 +318,21 @@ class CategoryRuleEngine:
         return updated_count
 
 
-# Global instance for the application
-rule_engine = CategoryRuleEngine()
+# Global instance for the application, created on first use
+_rule_engine: Optional[CategoryRuleEngine] = None
+
+
+def get_rule_engine() -> CategoryRuleEngine:
+    """Get the application's category rule engine, loading it from storage on first use."""
+    global _rule_engine
+    if _rule_engine is None:
+        _rule_engine = CategoryRuleEngine()
+    return _rule_engine
+
+
+def __getattr__(name):
+    # Module attribute access to rule_engine creates it lazily (PEP 562)
+    if name == 'rule_engine':
+        return get_rule_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
@@ -1,17 +1,48 @@
 """Exclusion rule model for sweep/removal of transactions based on keywords."""
+from collections import Counter
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import List
-import json
+from typing import Callable, Dict, List, Optional, Tuple
+import re
+import sys
 from pathlib import Path
 import uuid
+import numpy as np
 
+from backend.models.keyword_match import keyword_mask, lower_descriptions
+from backend.models.storage import dumps_json, loads_json, write_atomic
 
-@dataclass
+# Optional C-backed multi-pattern matcher; falls back to hyperscan or a regex
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional multi-pattern regex scanner, used when pyahocorasick is missing
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+def _parse_joined_keywords(keyword: str) -> List[List[str]]:
+    """Split a legacy joined-rule keyword ("a,b|OR|c") into its keyword groups."""
+    groups = []
+    for kw_set in keyword.split("|OR|"):
+        group = [kw.strip() for kw in kw_set.split(",") if kw.strip()]
+        if group:
+            groups.append(group)
+    return groups
+
+
+@dataclass(slots=True)
 class ExclusionRule:
     """
     Represents a rule for excluding/sweeping transactions based on keywords.
     
     A rule matches when ALL keywords are present in the transaction description.
+    A joined rule instead holds several keyword groups (or_groups) and matches
+    when ALL keywords of ANY one group are present.
     Matching is case-insensitive.
     Matching transactions will be removed from view and excluded from future uploads.
     """
@@ -20,25 +51,101 @@ class ExclusionRule:
     title: str = ""  # Optional title/name for the rule
     enabled: bool = True
     swept_count: int = 0  # Track how many transactions this rule has swept
+    or_groups: List[List[str]] = field(default_factory=list)  # Joined rules: ANY group may match
+    
+    # Lowercased keywords (refreshed when keywords or or_groups is reassigned)
+    _keywords_key: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _or_groups_key: Optional[List[List[str]]] = field(default=None, init=False, repr=False, compare=False)
+    _keywords_lower: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _keyword_sets: Tuple[Tuple[str, ...], ...] = field(default=(), init=False, repr=False, compare=False)
+    _min_length: int = field(default=0, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Migrate the old single-string encoding of joined rules
+        if not self.or_groups and len(self.keywords) == 1 and "|OR|" in self.keywords[0]:
+            or_groups = _parse_joined_keywords(self.keywords[0])
+            if or_groups:
+                self.or_groups = or_groups
+                self.keywords = [kw for group in or_groups for kw in group]
+    
+    @property
+    def keywords_lower(self) -> Tuple[str, ...]:
+        """Get the lowercased keywords, computed once per keywords list."""
+        self._refresh_keywords()
+        return self._keywords_lower
+    
+    @property
+    def keyword_sets(self) -> Tuple[Tuple[str, ...], ...]:
+        """
+        Get the lowercased keyword sets the rule can match on.
+        
+        A joined rule has one set per non-empty OR group; a regular rule has
+        its keywords as the single set.
+        """
+        self._refresh_keywords()
+        return self._keyword_sets
+    
+    @property
+    def min_match_length(self) -> int:
+        """
+        Get the shortest (lowercased) description length that could match.
+        
+        A description must be at least as long as the longest keyword it has
+        to contain; for a joined rule, the easiest keyword set decides.
+        """
+        self._refresh_keywords()
+        return self._min_length
+    
+    def _refresh_keywords(self):
+        """Recompute the lowercased keyword caches if keywords or or_groups has changed."""
+        if self._keywords_key is self.keywords and self._or_groups_key is self.or_groups:
+            return
+        self._keywords_key = self.keywords
+        self._or_groups_key = self.or_groups
+        # Interned, so rules sharing a keyword share one string object
+        self._keywords_lower = tuple(sys.intern(keyword.lower()) for keyword in self.keywords)
+        
+        if self.or_groups:
+            keyword_sets = tuple(
+                tuple(sys.intern(kw.lower()) for kw in group) for group in self.or_groups if group
+            )
+            self._keyword_sets = keyword_sets
+            self._min_length = min(
+                (max(map(len, keywords)) for keywords in keyword_sets), default=0
+            )
+        else:
+            self._keyword_sets = (self._keywords_lower,)
+            self._min_length = max(map(len, self._keywords_lower), default=0)
     
     def matches(self, description: str) -> bool:
         """
         Check if this rule matches the given description.
         
-        All keywords must be present (AND logic).
+        All keywords must be present (AND logic); for a joined rule, all
+        keywords of any one group must be present (OR between groups).
         Matching is case-insensitive.
         
         Args:
             description: The transaction description to check
             
         Returns:
-            True if all keywords are found in the description
+            True if the rule's keywords are found in the description
         """
+        return self.matches_lower(description.lower())
+    
+    def matches_lower(self, desc_lower: str) -> bool:
+        """Check if this rule matches an already-lowercased description."""
         if not self.enabled:
             return False
         
-        desc_lower = description.lower()
-        return all(keyword.lower() in desc_lower for keyword in self.keywords)
+        if len(desc_lower) < self.min_match_length:
+            return False
+        if self.or_groups:
+            return any(
+                all(kw in desc_lower for kw in keywords)
+                for keywords in self.keyword_sets
+            )
+        return all(keyword in desc_lower for keyword in self.keywords_lower)
     
     def to_dict(self) -> dict:
         """Convert rule to dictionary."""
@@ -47,7 +154,8 @@ class ExclusionRule:
             'keywords': self.keywords,
             'title': self.title,
             'enabled': self.enabled,
-            'swept_count': self.swept_count
+            'swept_count': self.swept_count,
+            'or_groups': self.or_groups
         }
     
     @classmethod
@@ -58,10 +166,76 @@ class ExclusionRule:
             keywords=data['keywords'],
             title=data.get('title', ''),
             enabled=data.get('enabled', True),
-            swept_count=data.get('swept_count', 0)
+            swept_count=data.get('swept_count', 0),
+            or_groups=data.get('or_groups', [])
         )
 
 
+def _build_keyword_scanner(keyword_bits: Dict[str, int]) -> Callable[[str], int]:
+    """
+    Build a function mapping a lowercased description to the OR of the bits
+    of every keyword it contains.
+    
+    Uses the first available of: a pyahocorasick automaton, a hyperscan
+    database (one pattern per keyword, each reported once), or a single
+    compiled regex alternation. The regex only reports the first (longest)
+    keyword starting at each position, so each keyword's bits also cover the
+    keywords contained in it - those are present whenever it is.
+    """
+    if not keyword_bits:
+        return lambda desc_lower: 0
+    
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword, bit in keyword_bits.items():
+            automaton.add_word(keyword, bit)
+        automaton.make_automaton()
+        
+        def scan(desc_lower: str) -> int:
+            hits = 0
+            for _, bit in automaton.iter(desc_lower):
+                hits |= bit
+            return hits
+        return scan
+    
+    if hyperscan is not None:
+        keywords = list(keyword_bits)
+        # Pattern ids are C unsigned ints, so report indexes and map them to bits
+        bits = [keyword_bits[keyword] for keyword in keywords]
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[re.escape(keyword).encode('utf-8') for keyword in keywords],
+            ids=list(range(len(keywords))),
+            elements=len(keywords),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(keywords)
+        )
+        
+        def scan(desc_lower: str) -> int:
+            hits = [0]
+            def on_match(index, start, end, flags, context):
+                hits[0] |= bits[index]
+            database.scan(desc_lower.encode('utf-8'), match_event_handler=on_match)
+            return hits[0]
+        return scan
+    
+    # Keywords plus every other keyword they contain
+    covered = {
+        keyword: sum(bit for other, bit in keyword_bits.items() if other in keyword)
+        for keyword in keyword_bits
+    }
+    # Zero-width lookahead so overlapping keywords are all seen; longest first
+    union = re.compile('(?=(%s))' % '|'.join(
+        re.escape(keyword) for keyword in sorted(keyword_bits, key=len, reverse=True)
+    ))
+    
+    def scan(desc_lower: str) -> int:
+        hits = 0
+        for keyword in union.findall(desc_lower):
+            hits |= covered[keyword]
+        return hits
+    return scan
+
+
 class ExclusionRuleEngine:
     """
     Engine for managing and applying exclusion/sweep rules to transactions.
@@ -76,41 +250,82 @@ class ExclusionRuleEngine:
         """
         self.rules: List[ExclusionRule] = []
         self.storage_path = storage_path or Path(__file__).resolve().parent.parent.parent / 'data' / 'exclusion_rules.json'
+        self._matcher = None  # Keyword automaton, rebuilt when the rules change
+        self._matcher_key = None
+        self._save_suspended = False  # Set inside bulk() to defer writes
+        self._by_id: Dict[str, ExclusionRule] = {}  # id -> rule, kept in sync with self.rules
+        self._active_rules: List[ExclusionRule] = []  # Enabled rules, in order
+        self._last_saved_bytes = None  # Contents of the storage file as last read/written
         self._load_rules()
     
     def _load_rules(self):
         """Load rules from storage file."""
         if self.storage_path.exists():
             try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.storage_path, 'rb') as f:
+                    raw = f.read()
+                    data = loads_json(raw)
+                    self._last_saved_bytes = raw
                     self.rules = [ExclusionRule.from_dict(r) for r in data.get('rules', [])]
             except Exception as e:
                 print(f"Error loading exclusion rules: {e}")
                 self.rules = []
         else:
             self.rules = []
+        self._reindex()
+    
+    def _reindex(self):
+        """Rebuild the id index from the rule list."""
+        self._by_id = {}
+        for rule in self.rules:
+            self._by_id.setdefault(rule.id, rule)
+        self._refresh_active_rules()
+    
+    def _refresh_active_rules(self):
+        """Rebuild the list of enabled rules."""
+        self._active_rules = [rule for rule in self.rules if rule.enabled]
     
     def _save_rules(self):
-        """Save rules to storage file."""
+        """Save rules to storage file (deferred while inside bulk())."""
+        if self._save_suspended:
+            return
         try:
-            # Ensure data directory exists
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'rules': [r.to_dict() for r in self.rules]
-                }, f, indent=2)
+            payload = dumps_json({
+                'rules': [r.to_dict() for r in self.rules]
+            })
+            if payload == self._last_saved_bytes:
+                return  # Nothing changed since the last save
+            write_atomic(self.storage_path, payload)
+            self._last_saved_bytes = payload
         except Exception as e:
             print(f"Error saving exclusion rules: {e}")
     
-    def add_rule(self, keywords: List[str], title: str = "") -> ExclusionRule:
+    @contextmanager
+    def bulk(self):
+        """
+        Batch several rule changes into a single save.
+        
+        Saves made inside the block are skipped, and the rules are written
+        once when the outermost block exits.
+        """
+        suspended = self._save_suspended
+        self._save_suspended = True
+        try:
+            yield self
+        finally:
+            self._save_suspended = suspended
+            if not suspended:
+                self._save_rules()
+    
+    def add_rule(self, keywords: List[str], title: str = "",
+                 or_groups: List[List[str]] = None) -> ExclusionRule:
         """
         Add a new exclusion rule.
         
         Args:
             keywords: List of keywords that must ALL be present to match
             title: Optional title/name for the rule
+            or_groups: Keyword groups of a joined rule (optional)
             
         Returns:
             The created ExclusionRule
@@ -120,9 +335,12 @@ class ExclusionRuleEngine:
             keywords=keywords,
             title=title,
             enabled=True,
-            swept_count=0
+            swept_count=0,
+            or_groups=or_groups or []
         )
         self.rules.append(rule)
+        self._by_id.setdefault(rule.id, rule)
+        self._active_rules.append(rule)
         self._save_rules()
         return rule
     
@@ -140,18 +358,21 @@ class ExclusionRuleEngine:
         Returns:
             The updated ExclusionRule or None if not found
         """
-        for rule in self.rules:
-            if rule.id == rule_id:
-                if keywords is not None:
-                    rule.keywords = keywords
-                if title is not None:
-                    rule.title = title
-                if enabled is not None:
-                    rule.enabled = enabled
-                
-                self._save_rules()
-                return rule
-        return None
+        rule = self._by_id.get(rule_id)
+        if rule is None:
+            return None
+        
+        if keywords is not None:
+            rule.keywords = keywords
+            rule.or_groups = []  # Edited keywords make it a plain AND rule
+        if title is not None:
+            rule.title = title
+        if enabled is not None:
+            rule.enabled = enabled
+            self._refresh_active_rules()
+        
+        self._save_rules()
+        return rule
     
     def delete_rule(self, rule_id: str) -> bool:
         """
@@ -163,19 +384,22 @@ class ExclusionRuleEngine:
         Returns:
             True if deleted, False if not found
         """
-        for i, rule in enumerate(self.rules):
-            if rule.id == rule_id:
+        rule = self._by_id.pop(rule_id, None)
+        if rule is None:
+            return False
+        
+        for i, other in enumerate(self.rules):
+            if other is rule:
                 del self.rules[i]
-                self._save_rules()
-                return True
-        return False
+                break
+        if rule.enabled:
+            self._refresh_active_rules()
+        self._save_rules()
+        return True
     
     def get_rule(self, rule_id: str) -> ExclusionRule:
         """Get a rule by ID."""
-        for rule in self.rules:
-            if rule.id == rule_id:
-                return rule
-        return None
+        return self._by_id.get(rule_id)
     
     def get_all_rules(self) -> List[ExclusionRule]:
         """Get all rules."""
@@ -191,10 +415,67 @@ class ExclusionRuleEngine:
         Returns:
             True if any enabled rule matches, False otherwise
         """
-        for rule in self.rules:
-            if rule.matches(description):
-                return True
-        return False
+        return self._first_matching_rule(description.lower(), self._get_matcher()) is not None
+    
+    def _get_matcher(self) -> tuple:
+        """
+        Get the precomputed matcher for all enabled rules.
+        
+        Each distinct keyword gets one bit, and every enabled rule is paired with
+        the keyword masks it needs - one per keyword set, so a joined rule has
+        several. A scanner built over all keywords (see _build_keyword_scanner)
+        reports the bits of every keyword present in a description in one pass,
+        and a rule matches if all bits of one of its masks are present.
+        
+        The matcher is rebuilt only when a rule's keywords or enabled flag (or
+        the rule list) changes.
+        
+        Returns:
+            Tuple of (scan, [(rule, masks), ...], always_possible) where scan
+            maps a lowercased description to its keyword bits, and
+            always_possible is True if some keyword set has no keywords
+        """
+        key = [
+            (rule.id, rule.enabled, tuple(rule.keywords), tuple(map(tuple, rule.or_groups)))
+            for rule in self.rules
+        ]
+        if self._matcher is not None and self._matcher_key == key:
+            return self._matcher
+        
+        self._refresh_active_rules()  # A rule may have been toggled directly
+        keyword_bits: Dict[str, int] = {}
+        always_possible = False
+        rule_masks = []
+        for rule in self._active_rules:
+            masks = []
+            for keywords in rule.keyword_sets:  # Joined rule: any one set may match
+                mask = 0
+                for keyword in keywords:
+                    if keyword:  # An empty keyword is always present
+                        mask |= keyword_bits.setdefault(keyword, 1 << len(keyword_bits))
+                masks.append(mask)
+                if not mask:
+                    always_possible = True
+            rule_masks.append((rule, masks))
+        
+        self._matcher = (_build_keyword_scanner(keyword_bits), rule_masks, always_possible)
+        self._matcher_key = key
+        return self._matcher
+    
+    def _first_matching_rule(self, desc_lower: str, matcher: tuple) -> Optional[ExclusionRule]:
+        """Find the first enabled rule that matches the lowercased description."""
+        scan, rule_masks, always_possible = matcher
+        
+        # One pass over the description collects every keyword present
+        hits = scan(desc_lower)
+        if not hits and not always_possible:
+            return None
+        
+        for rule, masks in rule_masks:
+            for mask in masks:
+                if hits & mask == mask:
+                    return rule
+        return None
     
     def sweep_transactions(self, transactions: list) -> tuple:
         """
@@ -206,28 +487,19 @@ class ExclusionRuleEngine:
         Returns:
             Tuple of (remaining_transactions, swept_count)
         """
-        remaining = []
-        swept_count = 0
-        
-        # Track counts per rule for updating swept_count
-        rule_match_counts = {rule.id: 0 for rule in self.rules}
-        
-        for transaction in transactions:
-            excluded = False
-            for rule in self.rules:
-                if rule.matches(transaction.description):
-                    rule_match_counts[rule.id] += 1
-                    excluded = True
-                    break
-            
-            if excluded:
-                swept_count += 1
-            else:
-                remaining.append(transaction)
+        # Phase 1: find the first matching rule (or None) for every transaction
+        matcher = self._get_matcher()
+        first_match = self._first_matching_rule
+        matched = [first_match(t.description_lower, matcher) for t in transactions]
+        
+        # Phase 2: keep the unmatched ones and count sweeps per rule
+        remaining = [t for t, rule in zip(transactions, matched) if rule is None]
+        swept_count = len(transactions) - len(remaining)
+        rule_match_counts = Counter(rule.id for rule in matched if rule is not None) if swept_count else {}
         
         # Update swept counts on rules
-        for rule in self.rules:
-            if rule_match_counts[rule.id] > 0:
+        for rule in self._active_rules:
+            if rule.id in rule_match_counts:
                 rule.swept_count += rule_match_counts[rule.id]
         
         if swept_count > 0:
@@ -258,17 +530,15 @@ class ExclusionRuleEngine:
         Returns:
             Tuple of (count, all_matching_descriptions)
         """
-        count = 0
-        matches = []
-        
-        for transaction in transactions:
-            desc_lower = transaction.description.lower()
-            if all(kw.lower() in desc_lower for kw in keywords):
-                count += 1
-                # Include all matching transaction descriptions (truncated for display)
-                matches.append(transaction.description[:80] + ('...' if len(transaction.description) > 80 else ''))
+        keywords_lower = [kw.lower() for kw in keywords]
+        mask = keyword_mask(lower_descriptions(transactions), [keywords_lower])
         
-        return count, matches
+        # Include all matching transaction descriptions (truncated for display)
+        matches = [
+            transactions[i].description[:80] + ('...' if len(transactions[i].description) > 80 else '')
+            for i in np.flatnonzero(mask)
+        ]
+        return len(matches), matches
     
     def join_rules(self, rule_ids: List[str], new_title: str = "") -> ExclusionRule:
         """
@@ -286,22 +556,24 @@ class ExclusionRuleEngine:
         Returns:
             The new joined ExclusionRule, or None if no valid rules to join
         """
-        rules_to_join = [r for r in self.rules if r.id in rule_ids and r.enabled]
+        join_ids = set(rule_ids)
+        rules_to_join = [r for r in self.rules if r.id in join_ids and r.enabled]
         
         if len(rules_to_join) < 2:
             return None
         
-        # Collect all keyword sets - we'll store them as a list in the keywords field
-        # Format: each original rule's keywords separated by "|OR|" marker
-        all_keyword_sets = []
+        # Each original rule becomes one OR group (a joined rule brings its groups)
+        or_groups = []
         combined_swept_count = 0
         
         for rule in rules_to_join:
-            all_keyword_sets.append(",".join(rule.keywords))
+            for group in rule.or_groups or [rule.keywords]:
+                group = [kw.strip() for kw in group if kw.strip()]
+                if group:
+                    or_groups.append(group)
             combined_swept_count += rule.swept_count
         
-        # Use "|OR|" as separator to denote OR logic between keyword sets
-        combined_keywords = ["|OR|".join(all_keyword_sets)]
+        combined_keywords = [kw for group in or_groups for kw in group]
         
         # Create title from original rules if not provided
         if not new_title:
@@ -317,53 +589,36 @@ class ExclusionRuleEngine:
             keywords=combined_keywords,
             title=new_title,
             enabled=True,
-            swept_count=combined_swept_count
+            swept_count=combined_swept_count,
+            or_groups=or_groups
         )
         
-        # Delete original rules
-        for rule_id in rule_ids:
-            self.delete_rule(rule_id)
-        
-        # Add joined rule
-        self.rules.append(joined_rule)
-        self._save_rules()
+        # Replace the original rules with the joined rule in one write
+        with self.bulk():
+            for rule_id in rule_ids:
+                self.delete_rule(rule_id)
+            self.rules.append(joined_rule)
+            self._by_id[joined_rule.id] = joined_rule
+            self._active_rules.append(joined_rule)
         
         return joined_rule
 
 
-# Override the matches method to support OR logic for joined rules
-_original_matches = ExclusionRule.matches
+# Global instance for the application, created on first use
+_exclusion_engine: Optional[ExclusionRuleEngine] = None
 
-def _enhanced_matches(self, description: str) -> bool:
-    """
-    Enhanced matching that supports OR logic for joined rules.
-    
-    For regular rules: all keywords must match (AND logic).
-    For joined rules (keywords contain "|OR|"): any keyword set must match (OR logic).
-    """
-    if not self.enabled:
-        return False
-    
-    desc_lower = description.lower()
-    
-    # Check if this is a joined rule (contains OR marker)
-    if len(self.keywords) == 1 and "|OR|" in self.keywords[0]:
-        # Split into individual keyword sets
-        keyword_sets = self.keywords[0].split("|OR|")
-        # Match if ANY set matches (OR logic between sets)
-        for kw_set in keyword_sets:
-            # Each set is comma-separated keywords (AND logic within set)
-            keywords = [kw.strip() for kw in kw_set.split(",") if kw.strip()]
-            if keywords and all(kw.lower() in desc_lower for kw in keywords):
-                return True
-        return False
-    else:
-        # Regular rule: all keywords must match (AND logic)
-        return all(keyword.lower() in desc_lower for keyword in self.keywords)
 
-ExclusionRule.matches = _enhanced_matches
+def get_exclusion_engine() -> ExclusionRuleEngine:
+    """Get the application's exclusion rule engine, loading it from storage on first use."""
+    global _exclusion_engine
+    if _exclusion_engine is None:
+        _exclusion_engine = ExclusionRuleEngine()
+    return _exclusion_engine
 
 
-# Global instance for the application
-exclusion_engine = ExclusionRuleEngine()
+def __getattr__(name):
+    # Module attribute access to exclusion_engine creates it lazily (PEP 562)
+    if name == 'exclusion_engine':
+        return get_exclusion_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
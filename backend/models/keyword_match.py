@@ -0,0 +1,41 @@
+"""Vectorized keyword matching over a column of transaction descriptions."""
+from typing import Iterable, List, Sequence
+import numpy as np
+import pandas as pd
+
+
+def lower_descriptions(transactions: list) -> pd.Series:
+    """Get the lowercased descriptions of a list of transactions as a Series."""
+    return pd.Series([t.description_lower for t in transactions], dtype=object)
+
+
+def keyword_mask(desc_lower: pd.Series, keyword_sets: Iterable[Sequence[str]]) -> np.ndarray:
+    """
+    Find the rows containing all keywords of at least one keyword set.
+
+    Each keyword is one substring scan over the column, narrowed to the rows
+    that are still candidates: rows already matched by an earlier set, or
+    missing an earlier keyword of the same set, are not rescanned.
+
+    Args:
+        desc_lower: Lowercased descriptions
+        keyword_sets: Lowercased keyword sets (AND within a set, OR between sets)
+
+    Returns:
+        Boolean array, True where the description matches
+    """
+    mask = np.zeros(len(desc_lower), dtype=bool)
+    for keywords in keyword_sets:
+        rows = np.flatnonzero(~mask)
+        for keyword in keywords:
+            if not len(rows):
+                break
+            found = desc_lower.iloc[rows].str.contains(keyword, regex=False).to_numpy(dtype=bool)
+            rows = rows[found]
+        mask[rows] = True
+    return mask
+
+
+def select(transactions: list, mask: np.ndarray) -> List:
+    """Get the transactions where the mask is True, in order."""
+    return [transactions[i] for i in np.flatnonzero(mask)]
@@ -1,11 +1,12 @@
 """Period notes model for storing personal analysis per week/month."""
 from dataclasses import dataclass
 from typing import Dict, Optional
-import json
 from pathlib import Path
 
+from backend.models.storage import append_line, dumps_json_line, loads_json, write_atomic
 
-@dataclass
+
+@dataclass(slots=True)
 class PeriodNote:
     """
     Represents a personal analysis note for a specific period (week or month).
@@ -36,44 +37,98 @@ class PeriodNote:
 class PeriodNotesEngine:
     """
     Engine for managing personal analysis notes per period.
+    
+    Notes are stored as JSON Lines: each save appends the note as one line and
+    each delete appends a tombstone, with the last line for a period winning
+    on load. The file is compacted to one line per note once it holds more
+    than twice as many lines as there are notes.
     """
     
+    # Don't bother compacting files shorter than this
+    COMPACT_MIN_LINES = 64
+    
     def __init__(self, storage_path: Path = None):
         """
         Initialize the notes engine.
         
         Args:
-            storage_path: Path to store notes persistently (JSON file)
+            storage_path: Path to store notes persistently (JSON Lines file)
         """
         self.notes: Dict[str, PeriodNote] = {}
-        self.storage_path = storage_path or Path(__file__).resolve().parent.parent.parent / 'data' / 'period_notes.json'
+        self.storage_path = storage_path or Path(__file__).resolve().parent.parent.parent / 'data' / 'period_notes.jsonl'
+        self._line_count = 0  # Records currently in the storage file
         self._load_notes()
     
     def _load_notes(self):
         """Load notes from storage file."""
-        if self.storage_path.exists():
-            try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for note_data in data.get('notes', []):
-                        note = PeriodNote.from_dict(note_data)
+        self.notes = {}
+        self._line_count = 0
+        legacy_path = self.storage_path.with_suffix('.json')
+        if not self.storage_path.exists() and legacy_path.exists():
+            self._migrate_legacy(legacy_path)
+            return
+        if not self.storage_path.exists():
+            return
+        
+        damaged = False
+        try:
+            with open(self.storage_path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    self._line_count += 1
+                    try:
+                        data = loads_json(line)
+                    except ValueError:
+                        # A save interrupted mid-append leaves a partial last line
+                        print(f"Skipping unreadable period note record in {self.storage_path}")
+                        damaged = True
+                        continue
+                    if data.get('deleted'):
+                        self.notes.pop(data['period_key'], None)
+                    else:
+                        note = PeriodNote.from_dict(data)
                         self.notes[note.period_key] = note
-            except Exception as e:
-                print(f"Error loading period notes: {e}")
-                self.notes = {}
-        else:
+        except Exception as e:
+            print(f"Error loading period notes: {e}")
             self.notes = {}
+            return
+        if damaged:
+            self._compact()  # Drop the bad line so later appends start on a clean line
     
-    def _save_notes(self):
-        """Save notes to storage file."""
+    def _migrate_legacy(self, legacy_path: Path):
+        """Load notes from the old single-document JSON file and rewrite them as JSON Lines."""
         try:
-            # Ensure data directory exists
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'notes': [n.to_dict() for n in self.notes.values()]
-                }, f, indent=2)
+            with open(legacy_path, 'rb') as f:
+                data = loads_json(f.read())
+            for note_data in data.get('notes', []):
+                note = PeriodNote.from_dict(note_data)
+                self.notes[note.period_key] = note
+        except Exception as e:
+            print(f"Error loading period notes: {e}")
+            self.notes = {}
+            return
+        self._compact()
+    
+    def _append(self, record: dict):
+        """Append one record to the storage file, compacting it if it has grown too long."""
+        try:
+            append_line(self.storage_path, dumps_json_line(record))
+            self._line_count += 1
+        except Exception as e:
+            print(f"Error saving period notes: {e}")
+            return
+        if self._line_count > max(2 * len(self.notes), self.COMPACT_MIN_LINES):
+            self._compact()
+    
+    def _compact(self):
+        """Rewrite the storage file with exactly one line per note."""
+        try:
+            write_atomic(
+                self.storage_path,
+                b''.join(dumps_json_line(n.to_dict()) for n in self.notes.values())
+            )
+            self._line_count = len(self.notes)
         except Exception as e:
             print(f"Error saving period notes: {e}")
     
@@ -101,9 +156,13 @@ class PeriodNotesEngine:
         Returns:
             The saved PeriodNote
         """
+        existing = self.notes.get(period_key)
+        if existing is not None and existing.content == content:
+            return existing  # Unchanged - nothing to write
+        
         note = PeriodNote(period_key=period_key, content=content)
         self.notes[period_key] = note
-        self._save_notes()
+        self._append(note.to_dict())
         return note
     
     def delete_note(self, period_key: str) -> bool:
@@ -118,7 +177,7 @@ class PeriodNotesEngine:
         """
         if period_key in self.notes:
             del self.notes[period_key]
-            self._save_notes()
+            self._append({'period_key': period_key, 'deleted': True})
             return True
         return False
     
@@ -132,6 +191,21 @@ class PeriodNotesEngine:
         return {key: note.content for key, note in self.notes.items()}
 
 
-# Global instance for the application
-period_notes_engine = PeriodNotesEngine()
+# Global instance for the application, created on first use
+_period_notes_engine: Optional[PeriodNotesEngine] = None
+
+
+def get_period_notes_engine() -> PeriodNotesEngine:
+    """Get the application's period notes engine, loading it from storage on first use."""
+    global _period_notes_engine
+    if _period_notes_engine is None:
+        _period_notes_engine = PeriodNotesEngine()
+    return _period_notes_engine
+
+
+def __getattr__(name):
+    # Module attribute access to period_notes_engine creates it lazily (PEP 562)
+    if name == 'period_notes_engine':
+        return get_period_notes_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
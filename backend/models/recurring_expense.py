@@ -1,12 +1,16 @@
 """Recurring expense model for budget tracking."""
+from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import List, Optional
-import json
+from typing import Dict, List, Optional, Tuple
+import sys
 from pathlib import Path
 import uuid
 
+from backend.models.keyword_match import keyword_mask, lower_descriptions, select
+from backend.models.storage import dumps_json, loads_json, write_atomic
 
-@dataclass
+
+@dataclass(slots=True)
 class RecurringExpense:
     """
     Represents a recurring expense that can be linked to transactions.
@@ -22,6 +26,32 @@ class RecurringExpense:
     enabled: bool = True
     category: str = 'Other'  # Category for display purposes
     
+    # Lowercased keywords (refreshed when keywords is reassigned)
+    _keywords_key: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)
+    _keywords_lower: Tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _min_length: int = field(default=0, init=False, repr=False, compare=False)
+    
+    @property
+    def keywords_lower(self) -> Tuple[str, ...]:
+        """Get the lowercased keywords, computed once per keywords list."""
+        self._refresh_keywords()
+        return self._keywords_lower
+    
+    @property
+    def min_match_length(self) -> int:
+        """Get the shortest description length that could contain every keyword."""
+        self._refresh_keywords()
+        return self._min_length
+    
+    def _refresh_keywords(self):
+        """Recompute the lowercased keyword caches if keywords has changed."""
+        if self._keywords_key is self.keywords:
+            return
+        self._keywords_key = self.keywords
+        # Interned, so expenses sharing a keyword share one string object
+        self._keywords_lower = tuple(sys.intern(keyword.lower()) for keyword in self.keywords)
+        self._min_length = max(map(len, self._keywords_lower), default=0)
+    
     def matches(self, description: str) -> bool:
         """
         Check if this expense matches the given description.
@@ -35,11 +65,16 @@ class RecurringExpense:
         Returns:
             True if all keywords are found in the description
         """
+        return self.matches_lower(description.lower())
+    
+    def matches_lower(self, desc_lower: str) -> bool:
+        """Check if this expense matches an already-lowercased description."""
         if not self.enabled or not self.keywords:
             return False
         
-        desc_lower = description.lower()
-        return all(keyword.lower() in desc_lower for keyword in self.keywords)
+        if len(desc_lower) < self.min_match_length:
+            return False
+        return all(keyword in desc_lower for keyword in self.keywords_lower)
     
     def to_dict(self) -> dict:
         """Convert expense to dictionary."""
@@ -81,31 +116,57 @@ class RecurringExpenseEngine:
         """
         self.expenses: List[RecurringExpense] = []
         self.storage_path = storage_path or Path(__file__).resolve().parent.parent.parent / 'data' / 'recurring_expenses.json'
+        self._by_id: Dict[str, RecurringExpense] = {}  # id -> expense, kept in sync with self.expenses
+        self._by_frequency: Dict[str, List[RecurringExpense]] = {}  # Enabled expenses per frequency
+        self._totals: Dict[str, float] = {}  # Sum of enabled expense amounts per frequency
+        self._last_saved_bytes = None  # Contents of the storage file as last read/written
         self._load_expenses()
     
     def _load_expenses(self):
         """Load expenses from storage file."""
         if self.storage_path.exists():
             try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.storage_path, 'rb') as f:
+                    raw = f.read()
+                    data = loads_json(raw)
+                    self._last_saved_bytes = raw
                     self.expenses = [RecurringExpense.from_dict(e) for e in data.get('expenses', [])]
             except Exception as e:
                 print(f"Error loading recurring expenses: {e}")
                 self.expenses = []
         else:
             self.expenses = []
+        self._reindex()
+    
+    def _reindex(self):
+        """Rebuild the id index from the expense list."""
+        self._by_id = {}
+        for expense in self.expenses:
+            self._by_id.setdefault(expense.id, expense)
+        self._refresh_frequency_buckets()
+    
+    def _refresh_frequency_buckets(self):
+        """Regroup the enabled expenses by frequency and recompute their totals."""
+        by_frequency = defaultdict(list)
+        for expense in self.expenses:
+            if expense.enabled:
+                by_frequency[expense.frequency].append(expense)
+        self._by_frequency = dict(by_frequency)
+        self._totals = {
+            frequency: sum(e.amount for e in expenses)
+            for frequency, expenses in self._by_frequency.items()
+        }
     
     def _save_expenses(self):
         """Save expenses to storage file."""
         try:
-            # Ensure data directory exists
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'expenses': [e.to_dict() for e in self.expenses]
-                }, f, indent=2)
+            payload = dumps_json({
+                'expenses': [e.to_dict() for e in self.expenses]
+            })
+            if payload == self._last_saved_bytes:
+                return  # Nothing changed since the last save
+            write_atomic(self.storage_path, payload)
+            self._last_saved_bytes = payload
         except Exception as e:
             print(f"Error saving recurring expenses: {e}")
     
@@ -134,6 +195,8 @@ class RecurringExpenseEngine:
             category=category
         )
         self.expenses.append(expense)
+        self._by_id.setdefault(expense.id, expense)
+        self._refresh_frequency_buckets()
         self._save_expenses()
         return expense
     
@@ -155,24 +218,26 @@ class RecurringExpenseEngine:
         Returns:
             The updated RecurringExpense or None if not found
         """
-        for expense in self.expenses:
-            if expense.id == expense_id:
-                if name is not None:
-                    expense.name = name
-                if amount is not None:
-                    expense.amount = amount
-                if frequency is not None:
-                    expense.frequency = frequency
-                if keywords is not None:
-                    expense.keywords = keywords
-                if enabled is not None:
-                    expense.enabled = enabled
-                if category is not None:
-                    expense.category = category
-                
-                self._save_expenses()
-                return expense
-        return None
+        expense = self._by_id.get(expense_id)
+        if expense is None:
+            return None
+        
+        if name is not None:
+            expense.name = name
+        if amount is not None:
+            expense.amount = amount
+        if frequency is not None:
+            expense.frequency = frequency
+        if keywords is not None:
+            expense.keywords = keywords
+        if enabled is not None:
+            expense.enabled = enabled
+        if category is not None:
+            expense.category = category
+        
+        self._refresh_frequency_buckets()
+        self._save_expenses()
+        return expense
     
     def delete_expense(self, expense_id: str) -> bool:
         """
@@ -184,19 +249,21 @@ class RecurringExpenseEngine:
         Returns:
             True if deleted, False if not found
         """
-        for i, expense in enumerate(self.expenses):
-            if expense.id == expense_id:
+        expense = self._by_id.pop(expense_id, None)
+        if expense is None:
+            return False
+        
+        for i, other in enumerate(self.expenses):
+            if other is expense:
                 del self.expenses[i]
-                self._save_expenses()
-                return True
-        return False
+                break
+        self._refresh_frequency_buckets()
+        self._save_expenses()
+        return True
     
     def get_expense(self, expense_id: str) -> Optional[RecurringExpense]:
         """Get an expense by ID."""
-        for expense in self.expenses:
-            if expense.id == expense_id:
-                return expense
-        return None
+        return self._by_id.get(expense_id)
     
     def get_all_expenses(self) -> List[RecurringExpense]:
         """Get all expenses."""
@@ -204,9 +271,10 @@ class RecurringExpenseEngine:
     
     def get_expenses_by_frequency(self, frequency: str) -> List[RecurringExpense]:
         """Get expenses filtered by frequency."""
-        return [e for e in self.expenses if e.frequency == frequency and e.enabled]
+        return list(self._by_frequency.get(frequency, ()))
     
-    def link_to_transactions(self, expense: RecurringExpense, transactions: list) -> int:
+    def link_to_transactions(self, expense: RecurringExpense, transactions: list,
+                             desc_lower=None) -> int:
         """
         Link a recurring expense to matching transactions.
         
@@ -215,22 +283,22 @@ class RecurringExpenseEngine:
         Args:
             expense: The recurring expense with keywords
             transactions: List of Transaction objects
+            desc_lower: Lowercased descriptions of the transactions (optional,
+                built from the transactions if not given)
             
         Returns:
             Number of transactions that were linked
         """
-        if not expense.keywords:
+        if not expense.enabled or not expense.keywords:
             return 0
         
-        linked_count = 0
-        for transaction in transactions:
-            if expense.matches(transaction.description):
-                # Set recurrence to Recurring
-                if hasattr(transaction, 'recurrence'):
-                    transaction.recurrence = 'Recurring'
-                    linked_count += 1
+        if desc_lower is None:
+            desc_lower = lower_descriptions(transactions)
+        matched = select(transactions, keyword_mask(desc_lower, [expense.keywords_lower]))
+        for transaction in matched:
+            transaction.recurrence = 'Recurring'  # Every Transaction has a recurrence field
         
-        return linked_count
+        return len(matched)
     
     def link_all_expenses(self, transactions: list) -> int:
         """
@@ -243,9 +311,10 @@ class RecurringExpenseEngine:
             Total number of transactions that were linked
         """
         total_linked = 0
+        desc_lower = lower_descriptions(transactions)  # Shared by every expense
         for expense in self.expenses:
             if expense.enabled and expense.keywords:
-                total_linked += self.link_to_transactions(expense, transactions)
+                total_linked += self.link_to_transactions(expense, transactions, desc_lower)
         return total_linked
     
     def find_matching_transactions(self, expense: RecurringExpense, transactions: list) -> list:
@@ -259,10 +328,10 @@ class RecurringExpenseEngine:
         Returns:
             List of matching transactions
         """
-        if not expense.keywords:
+        if not expense.enabled or not expense.keywords:
             return []
         
-        return [t for t in transactions if expense.matches(t.description)]
+        return select(transactions, keyword_mask(lower_descriptions(transactions), [expense.keywords_lower]))
     
     def preview_matches(self, keywords: List[str], transactions: list, limit: int = 10) -> dict:
         """
@@ -280,21 +349,19 @@ class RecurringExpenseEngine:
             return {'count': 0, 'samples': []}
         
         keywords_lower = [k.lower() for k in keywords]
-        matches = []
+        matched = select(transactions, keyword_mask(lower_descriptions(transactions), [keywords_lower]))
         
-        for t in transactions:
-            desc_lower = t.description.lower()
-            if all(kw in desc_lower for kw in keywords_lower):
-                matches.append({
+        return {
+            'count': len(matched),
+            'samples': [
+                {
                     'description': t.description,
                     'amount': t.amount,
                     'date': t.transaction_date.strftime('%Y-%m-%d'),
                     'category': t.category
-                })
-        
-        return {
-            'count': len(matches),
-            'samples': matches[:limit]
+                }
+                for t in matched[:limit]
+            ]
         }
     
     def get_totals_by_frequency(self) -> dict:
@@ -304,8 +371,8 @@ class RecurringExpenseEngine:
         Returns:
             Dictionary with weekly and monthly totals
         """
-        weekly_total = sum(e.amount for e in self.expenses if e.frequency == 'weekly' and e.enabled)
-        monthly_total = sum(e.amount for e in self.expenses if e.frequency == 'monthly' and e.enabled)
+        weekly_total = self._totals.get('weekly', 0)
+        monthly_total = self._totals.get('monthly', 0)
         
         return {
             'weekly': round(weekly_total, 2),
@@ -314,6 +381,21 @@ class RecurringExpenseEngine:
         }
 
 
-# Global instance for the application
-recurring_expense_engine = RecurringExpenseEngine()
+# Global instance for the application, created on first use
+_recurring_expense_engine: Optional[RecurringExpenseEngine] = None
+
+
+def get_recurring_expense_engine() -> RecurringExpenseEngine:
+    """Get the application's recurring expense engine, loading it from storage on first use."""
+    global _recurring_expense_engine
+    if _recurring_expense_engine is None:
+        _recurring_expense_engine = RecurringExpenseEngine()
+    return _recurring_expense_engine
+
+
+def __getattr__(name):
+    # Module attribute access to recurring_expense_engine creates it lazily (PEP 562)
+    if name == 'recurring_expense_engine':
+        return get_recurring_expense_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
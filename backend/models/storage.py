@@ -0,0 +1,61 @@
+"""JSON file storage helpers shared by the model engines."""
+import json
+import os
+from pathlib import Path
+
+# Optional fast JSON (de)serializer; falls back to the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads_json(raw: bytes):
+    """Parse JSON from the raw bytes of a storage file."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps_json(payload) -> bytes:
+    """Serialize a payload to indented JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    return json.dumps(payload, indent=2).encode('utf-8')
+
+
+def dumps_json_line(payload) -> bytes:
+    """Serialize a payload to one compact JSON Lines record (newline-terminated)."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def append_line(path: Path, line: bytes):
+    """Append one record to a JSON Lines file and flush it to disk."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'ab') as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def write_atomic(path: Path, data: bytes):
+    """
+    Replace a file's contents without ever leaving it half-written.
+
+    The data is written and fsynced to a temporary file next to the target,
+    which is then renamed over it, so an interrupted save leaves the previous
+    file intact.
+
+    Args:
+        path: File to write
+        data: Complete new file contents
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -1,4 +1,5 @@
 """Transaction data model."""
+import sys
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from typing import Optional
@@ -23,7 +24,12 @@ class RecurrenceType:
     # Note: Income transactions can still be Recurring (e.g., paychecks)
 
 
-@dataclass
+def _intern(value):
+    """Intern a string value, passing anything else through unchanged."""
+    return sys.intern(value) if type(value) is str else value
+
+
+@dataclass(slots=True)
 class Transaction:
     """Represents a financial transaction with multi-dimensional classification."""
     
@@ -41,6 +47,28 @@ class Transaction:
     recurrence: str = field(default=RecurrenceType.UNKNOWN)      # Subscription/Recurring/One-time
     note: Optional[str] = None                                   # User-added note for the transaction
     
+    # Cached lowercase forms for keyword matching (refreshed when the source field changes)
+    _description_key: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _description_lower: str = field(default='', init=False, repr=False, compare=False)
+    _category_key: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _category_lower: str = field(default='', init=False, repr=False, compare=False)
+    
+    # Sign of the amount, set once at construction (amounts are never edited)
+    is_expense: bool = field(default=False, init=False, repr=False, compare=False)  # Negative amount
+    is_income: bool = field(default=False, init=False, repr=False, compare=False)   # Positive amount
+    
+    def __post_init__(self):
+        # Thousands of transactions repeat a few dozen categories and a few
+        # hundred merchants, so share one string object per distinct value
+        self.description = _intern(self.description)
+        self.category = _intern(self.category)
+        self.bank = _intern(self.bank)
+        self.necessity = _intern(self.necessity)
+        self.recurrence = _intern(self.recurrence)
+        
+        self.is_expense = self.amount < 0
+        self.is_income = self.amount > 0
+    
     def to_dict(self):
         """Convert transaction to dictionary."""
         return {
@@ -74,19 +102,25 @@ class Transaction:
         ]
     
     @property
-    def month_year(self):
-        """Get month-year string for grouping."""
-        return self.transaction_date.strftime('%Y-%m')
+    def description_lower(self) -> str:
+        """Get the lowercased description, computed once per description value."""
+        if self._description_key is not self.description:
+            self._description_key = self.description
+            self._description_lower = (self.description or '').lower()
+        return self._description_lower
     
     @property
-    def is_expense(self):
-        """Check if transaction is an expense (negative amount)."""
-        return self.amount < 0
+    def category_lower(self) -> str:
+        """Get the lowercased category, computed once per category value."""
+        if self._category_key is not self.category:
+            self._category_key = self.category
+            self._category_lower = (self.category or '').lower()
+        return self._category_lower
     
     @property
-    def is_income(self):
-        """Check if transaction is income (positive amount)."""
-        return self.amount > 0
+    def month_year(self):
+        """Get month-year string for grouping."""
+        return self.transaction_date.strftime('%Y-%m')
     
     @property
     def is_essential(self):
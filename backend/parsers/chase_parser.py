@@ -1,9 +1,23 @@
 """Chase CSV parser."""
 import pandas as pd
-from datetime import datetime
-from typing import List
+from typing import IO, Iterator, List, Union
 from backend.models.transaction import Transaction, RecurrenceType
 from backend.analytics.expense_classifier import ExpenseClassifier
+from backend.parsers.columns import (
+    CHUNK_ROWS, constant_column, convert_column, iter_rows, parse_amount, parse_any_date, parse_us_date,
+    strptime_cached
+)
+
+
+def _optional_str(value) -> str:
+    """Get a stripped string cell, or '' for an empty cell."""
+    return str(value).strip() if pd.notna(value) else ''
+
+
+def _report_row_error(error: Exception):
+    """Report a row that could not be parsed (the row is skipped)."""
+    print(f"Error parsing Chase row: {error}")
+
 
 class ChaseParser:
     """Parser for Chase bank CSV files."""
@@ -14,6 +28,15 @@ class ChaseParser:
     # Chase credit card format (if they use a different format)
     CREDIT_CARD_COLUMNS = {'Transaction Date', 'Post Date', 'Description', 'Category', 'Type', 'Amount'}
     
+    # Column types for read_csv, so pandas skips type inference: cells are read as
+    # text (the parsers convert them), and the low-cardinality columns as categories
+    CSV_DTYPES = {
+        **dict.fromkeys(['Posting Date', 'Transaction Date', 'Post Date', 'Date'], str),
+        **dict.fromkeys(['Description', 'Merchant', 'Payee', 'Name', 'Memo'], str),
+        **dict.fromkeys(['Amount', 'Transaction Amount', 'Debit', 'Credit', 'Balance', 'Check or Slip #'], str),
+        **dict.fromkeys(['Details', 'Type', 'Category'], 'category'),
+    }
+    
     # Category mapping based on Chase transaction types
     TYPE_CATEGORY_MAP = {
         'ACH_CREDIT': 'Income',
@@ -33,130 +56,133 @@ class ChaseParser:
     }
     
     @staticmethod
-    def parse(file_path: str, use_csv_categories: bool = False) -> List[Transaction]:
+    def parse(file_path: Union[str, IO], use_csv_categories: bool = False) -> List[Transaction]:
         """
         Parse Chase CSV file and return list of transactions.
         
         Args:
-            file_path: Path to the Chase CSV file
+            file_path: Path to the Chase CSV file, or an open file object
             use_csv_categories: If True, use categories from CSV and skip auto-classification.
                                If False, all categories will be set to 'Other' for auto-tagging rules to apply.
             
         Returns:
             List of Transaction objects with full classification
         """
-        try:
-            # Read CSV file (index_col=False prevents pandas from using first column as index)
-            df = pd.read_csv(file_path, index_col=False)
-            
-            # Determine which format this is
-            df_columns = set(df.columns)
-            
-            if ChaseParser.CHECKING_COLUMNS.issubset(df_columns):
-                transactions = ChaseParser._parse_checking_format(df, use_csv_categories)
-            elif ChaseParser.CREDIT_CARD_COLUMNS.issubset(df_columns):
-                transactions = ChaseParser._parse_credit_card_format(df, use_csv_categories)
-            else:
-                # Try to be flexible - look for key columns
-                transactions = ChaseParser._parse_flexible(df, use_csv_categories)
-            
-            # Set default recurrence to One-time for all transactions
-            for t in transactions:
-                t.recurrence = RecurrenceType.ONE_TIME
-            
-            # Only apply auto-classification if NOT using CSV categories
-            if not use_csv_categories:
-                return ExpenseClassifier.classify_batch(transactions)
+        return list(ChaseParser.parse_iter(file_path, use_csv_categories))
+    
+    @staticmethod
+    def parse_iter(file_path: Union[str, IO], use_csv_categories: bool = False) -> Iterator[Transaction]:
+        """
+        Parse Chase CSV file, yielding each transaction as soon as it is classified.
+        
+        Args:
+            file_path: Path to the Chase CSV file, or an open file object
+            use_csv_categories: If True, use categories from CSV and skip auto-classification.
+                               If False, all categories will be set to 'Other' for auto-tagging rules to apply.
             
-            return transactions
+        Yields:
+            Transaction objects with full classification
+        """
+        try:
+            # Read the CSV a chunk of rows at a time so large exports are never held
+            # in memory whole (index_col=False prevents pandas from using first column as index)
+            with pd.read_csv(file_path, index_col=False, dtype=ChaseParser.CSV_DTYPES, engine='c',
+                             chunksize=CHUNK_ROWS) as chunks:
+                for df in chunks:
+                    # Determine which format this is
+                    df_columns = set(df.columns)
+                    
+                    if ChaseParser.CHECKING_COLUMNS.issubset(df_columns):
+                        transactions = ChaseParser._parse_checking_format(df, use_csv_categories)
+                    elif ChaseParser.CREDIT_CARD_COLUMNS.issubset(df_columns):
+                        transactions = ChaseParser._parse_credit_card_format(df, use_csv_categories)
+                    else:
+                        # Try to be flexible - look for key columns
+                        transactions = ChaseParser._parse_flexible(df, use_csv_categories)
+                    
+                    for t in transactions:
+                        # Set default recurrence to One-time
+                        t.recurrence = RecurrenceType.ONE_TIME
+                        
+                        # Only apply auto-classification if NOT using CSV categories
+                        if not use_csv_categories:
+                            ExpenseClassifier.classify(t)
+                        
+                        yield t
             
         except Exception as e:
             raise Exception(f"Error parsing Chase CSV: {str(e)}")
     
     @staticmethod
-    def _parse_checking_format(df: pd.DataFrame, use_csv_categories: bool = False) -> List[Transaction]:
+    def _parse_checking_format(df: pd.DataFrame, use_csv_categories: bool = False) -> Iterator[Transaction]:
         """Parse Chase checking/savings account CSV format."""
-        transactions = []
+        # Convert whole columns up front; each distinct value is parsed once
+        post_dates = convert_column(df['Posting Date'], parse_us_date)
+        amounts = convert_column(df['Amount'], parse_amount)
+        descriptions = convert_column(df['Description'], lambda v: str(v).strip().strip('"'))
+        chase_types = convert_column(df['Type'], _optional_str)
+        details = convert_column(df['Details'], _optional_str)
         
-        for _, row in df.iterrows():
-            try:
-                # Parse date (Posting Date)
-                post_date = datetime.strptime(str(row['Posting Date']).strip(), '%m/%d/%Y')
-                
-                # Parse amount - clean it up
-                amount_str = str(row['Amount']).replace(',', '').replace('$', '').strip()
-                amount = float(amount_str)
-                
-                # Get description
-                description = str(row['Description']).strip().strip('"')
-                
-                # Only use CSV categories if explicitly requested
-                if use_csv_categories:
-                    # Determine category from Type
-                    chase_type = str(row['Type']).strip() if pd.notna(row['Type']) else ''
-                    category = ChaseParser.TYPE_CATEGORY_MAP.get(chase_type, 'Other')
-                    # Further categorize based on description keywords
-                    category = ChaseParser._categorize_by_description(description, category)
-                else:
-                    # Set to 'Other' so auto-tagging rules can apply
-                    category = 'Other'
-                
-                # Details indicates CREDIT/DEBIT
-                chase_type = str(row['Type']).strip() if pd.notna(row['Type']) else ''
-                details = str(row['Details']).strip() if pd.notna(row['Details']) else ''
-                
-                transaction = Transaction(
-                    transaction_date=post_date,  # Use posting date as transaction date
-                    post_date=post_date,
-                    description=description,
-                    amount=amount,
-                    category=category,
-                    bank='Chase',
-                    type=chase_type if chase_type else details,
-                    memo=None
-                )
-                transactions.append(transaction)
-            except Exception as e:
-                print(f"Error parsing Chase row: {e}")
-                continue
-        
-        return transactions
+        for post_date, amount, description, chase_type, detail in iter_rows(
+            post_dates, amounts, descriptions, chase_types, details, on_error=_report_row_error
+        ):
+            # Only use CSV categories if explicitly requested
+            if use_csv_categories:
+                # Determine category from Type, then refine based on description keywords
+                category = ChaseParser.TYPE_CATEGORY_MAP.get(chase_type, 'Other')
+                category = ChaseParser._categorize_by_description(description, category)
+            else:
+                # Set to 'Other' so auto-tagging rules can apply
+                category = 'Other'
+            
+            yield Transaction(
+                transaction_date=post_date,  # Use posting date as transaction date
+                post_date=post_date,
+                description=description,
+                amount=amount,
+                category=category,
+                bank='Chase',
+                type=chase_type if chase_type else detail,  # Details indicates CREDIT/DEBIT
+                memo=None
+            )
     
     @staticmethod
-    def _parse_credit_card_format(df: pd.DataFrame, use_csv_categories: bool = False) -> List[Transaction]:
+    def _parse_credit_card_format(df: pd.DataFrame, use_csv_categories: bool = False) -> Iterator[Transaction]:
         """Parse Chase credit card CSV format."""
-        transactions = []
+        # Only use CSV categories if explicitly requested; otherwise set to
+        # 'Other' so auto-tagging rules can apply
+        if use_csv_categories:
+            categories = convert_column(df['Category'], lambda v: str(v).strip() if pd.notna(v) else 'Other')
+        else:
+            categories = constant_column(len(df), 'Other')
+        transaction_dates = convert_column(df['Transaction Date'], lambda v: strptime_cached(v, '%m/%d/%Y'))
+        post_dates = convert_column(df['Post Date'], lambda v: strptime_cached(v, '%m/%d/%Y'))
+        descriptions = convert_column(df['Description'], lambda v: str(v).strip())
+        amounts = convert_column(df['Amount'], float)
+        types = convert_column(df['Type'], lambda v: str(v).strip() if pd.notna(v) else None)
+        if 'Memo' in df.columns:
+            memos = convert_column(df['Memo'], lambda v: str(v).strip() if pd.notna(v) else None)
+        else:
+            memos = constant_column(len(df), None)
         
-        for _, row in df.iterrows():
-            try:
-                # Only use CSV categories if explicitly requested
-                if use_csv_categories:
-                    category = str(row['Category']).strip() if pd.notna(row['Category']) else 'Other'
-                else:
-                    # Set to 'Other' so auto-tagging rules can apply
-                    category = 'Other'
-                
-                transaction = Transaction(
-                    transaction_date=datetime.strptime(row['Transaction Date'], '%m/%d/%Y'),
-                    post_date=datetime.strptime(row['Post Date'], '%m/%d/%Y'),
-                    description=str(row['Description']).strip(),
-                    amount=float(row['Amount']),
-                    category=category,
-                    bank='Chase',
-                    type=str(row['Type']).strip() if pd.notna(row['Type']) else None,
-                    memo=str(row.get('Memo', '')).strip() if 'Memo' in row and pd.notna(row.get('Memo')) else None
-                )
-                transactions.append(transaction)
-            except Exception as e:
-                print(f"Error parsing Chase row: {e}")
-                continue
-        
-        return transactions
+        for category, transaction_date, post_date, description, amount, chase_type, memo in iter_rows(
+            categories, transaction_dates, post_dates, descriptions, amounts, types, memos,
+            on_error=_report_row_error
+        ):
+            yield Transaction(
+                transaction_date=transaction_date,
+                post_date=post_date,
+                description=description,
+                amount=amount,
+                category=category,
+                bank='Chase',
+                type=chase_type,
+                memo=memo
+            )
     
     @staticmethod
-    def _parse_flexible(df: pd.DataFrame, use_csv_categories: bool = False) -> List[Transaction]:
+    def _parse_flexible(df: pd.DataFrame, use_csv_categories: bool = False) -> Iterator[Transaction]:
         """Flexibly parse Chase CSV by finding common column names."""
-        transactions = []
         columns = df.columns.tolist()
         
         # Try to find date column
@@ -189,50 +215,37 @@ class ChaseParser:
         if not desc_col:
             raise ValueError("Could not find a description column in Chase CSV")
         
-        for _, row in df.iterrows():
-            try:
-                # Parse date
-                date_str = str(row[date_col]).strip()
-                try:
-                    parsed_date = datetime.strptime(date_str, '%m/%d/%Y')
-                except:
-                    parsed_date = datetime.strptime(date_str, '%Y-%m-%d')
-                
-                # Parse amount
-                amount_str = str(row[amount_col]).replace(',', '').replace('$', '').strip()
-                amount = float(amount_str)
-                
-                # Get description
-                description = str(row[desc_col]).strip()
-                
-                # Only use CSV categories if explicitly requested
-                if use_csv_categories:
-                    category = 'Other'
-                    if 'Category' in columns and pd.notna(row['Category']):
-                        category = str(row['Category']).strip()
-                    elif 'Type' in columns and pd.notna(row['Type']):
-                        chase_type = str(row['Type']).strip()
-                        category = ChaseParser.TYPE_CATEGORY_MAP.get(chase_type, 'Other')
-                else:
-                    # Set to 'Other' so auto-tagging rules can apply
-                    category = 'Other'
-                
-                transaction = Transaction(
-                    transaction_date=parsed_date,
-                    post_date=parsed_date,
-                    description=description,
-                    amount=amount,
-                    category=category,
-                    bank='Chase',
-                    type=None,
-                    memo=None
+        dates = convert_column(df[date_col], parse_any_date)
+        amounts = convert_column(df[amount_col], parse_amount)
+        descriptions = convert_column(df[desc_col], lambda v: str(v).strip())
+        
+        # Only use CSV categories if explicitly requested: the Category column
+        # wins, then the Type column; otherwise 'Other' so auto-tagging rules can apply
+        categories = constant_column(len(df), 'Other')
+        if use_csv_categories:
+            if 'Type' in columns:
+                categories = convert_column(
+                    df['Type'],
+                    lambda v: ChaseParser.TYPE_CATEGORY_MAP.get(str(v).strip(), 'Other') if pd.notna(v) else 'Other'
                 )
-                transactions.append(transaction)
-            except Exception as e:
-                print(f"Error parsing Chase row: {e}")
-                continue
+            if 'Category' in columns:
+                has_category = df['Category'].notna().to_numpy()
+                csv_categories, _ = convert_column(df['Category'], lambda v: str(v).strip())
+                categories[0][has_category] = csv_categories[has_category]
         
-        return transactions
+        for parsed_date, amount, description, category in iter_rows(
+            dates, amounts, descriptions, categories, on_error=_report_row_error
+        ):
+            yield Transaction(
+                transaction_date=parsed_date,
+                post_date=parsed_date,
+                description=description,
+                amount=amount,
+                category=category,
+                bank='Chase',
+                type=None,
+                memo=None
+            )
     
     @staticmethod
     def _categorize_by_description(description: str, default_category: str) -> str:
@@ -0,0 +1,106 @@
+"""Column-at-a-time value conversion shared by the CSV parsers."""
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Tuple
+import numpy as np
+import pandas as pd
+
+# Rows read from a CSV at a time; bounds the parsers' DataFrame memory
+CHUNK_ROWS = 10000
+
+
+@lru_cache(maxsize=4096)
+def strptime_cached(date_str: str, fmt: str) -> datetime:
+    """
+    datetime.strptime, memoized across columns and chunks.
+
+    Exports repeat the same few hundred dates (and a credit card's
+    transaction and post dates mostly coincide), so each one is parsed once.
+    """
+    return datetime.strptime(date_str, fmt)
+
+
+def parse_us_date(value) -> datetime:
+    """Parse an MM/DD/YYYY date cell."""
+    return strptime_cached(str(value).strip(), '%m/%d/%Y')
+
+
+def parse_any_date(value) -> datetime:
+    """Parse an MM/DD/YYYY or YYYY-MM-DD date cell."""
+    date_str = str(value).strip()
+    try:
+        return strptime_cached(date_str, '%m/%d/%Y')
+    except:
+        return strptime_cached(date_str, '%Y-%m-%d')
+
+
+def parse_amount(value) -> float:
+    """Parse an amount cell, allowing thousands separators and a dollar sign."""
+    return float(str(value).replace(',', '').replace('$', '').strip())
+
+
+def constant_column(length: int, value) -> Tuple[np.ndarray, np.ndarray]:
+    """Build a (results, failed) column holding the same value on every row."""
+    results = np.empty(length, dtype=object)
+    results[:] = [value] * length
+    return results, np.zeros(length, dtype=bool)
+
+
+def convert_column(values: pd.Series, convert: Callable[[Any], Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert every value of a column, calling convert once per distinct value.
+
+    Bank exports repeat the same dates, types and categories on many rows, so
+    converting the distinct values and broadcasting the results back is much
+    cheaper than converting row by row, while giving exactly the same results.
+
+    Args:
+        values: The column to convert
+        convert: Function converting one raw cell; may raise for bad input
+
+    Returns:
+        Tuple of (results, failed): per-row object array of converted values
+        (or the exception raised for that value), and a boolean array marking
+        the rows whose conversion raised
+    """
+    if values.dtype.kind == 'f':
+        # Group floats by bit pattern so -0.0 and 0.0 stay distinct
+        raw = values.to_numpy()
+        codes, _ = pd.factorize(raw.view(np.int64))
+        uniques = raw[np.unique(codes, return_index=True)[1]]
+    else:
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    converted = np.empty(len(uniques), dtype=object)
+    failed = np.zeros(len(uniques), dtype=bool)
+    for i, value in enumerate(uniques):
+        try:
+            converted[i] = convert(value)
+        except Exception as e:
+            converted[i] = e
+            failed[i] = True
+    return converted[codes], failed[codes]
+
+
+def iter_rows(*fields: Tuple[np.ndarray, np.ndarray], on_error: Callable[[Exception], None]) -> Iterator[tuple]:
+    """
+    Zip converted columns back into rows, skipping rows with a failed value.
+    
+    Bad rows are found with one mask over the failure flags and reported up
+    front, so the good rows are zipped without any per-row checks.
+
+    Args:
+        fields: (results, failed) pairs from convert_column, in the order the
+            values of a row should be checked
+        on_error: Called with the first failure of each skipped row
+
+    Returns:
+        Iterator over one tuple of converted values per good row, in row order
+    """
+    failed = np.logical_or.reduce([f for _, f in fields])
+    columns = [results for results, _ in fields]
+    if failed.any():
+        for row in np.flatnonzero(failed):
+            on_error(next(results[row] for results, row_failed in fields if row_failed[row]))
+        good = ~failed
+        columns = [results[good] for results in columns]
+    return zip(*columns)
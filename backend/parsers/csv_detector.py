@@ -1,6 +1,8 @@
 """CSV auto-detector for identifying bank/card type from CSV columns."""
+import csv
 import pandas as pd
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import IO, Tuple, Optional, Union
 from enum import Enum
 
 
@@ -45,12 +47,13 @@ class CSVDetector:
     }
     
     @classmethod
-    def detect(cls, file_path: str) -> Tuple[CSVType, float, bool]:
+    def detect(cls, file_path: Union[str, IO]) -> Tuple[CSVType, float, bool]:
         """
         Detect the type of CSV file based on its columns.
         
         Args:
-            file_path: Path to the CSV file
+            file_path: Path to the CSV file, or an open file object (rewound
+                       after the header is read so it can be parsed next)
             
         Returns:
             Tuple of (CSVType, confidence_score, has_categories)
@@ -60,14 +63,49 @@ class CSVDetector:
         """
         try:
             # Read just the header row
-            df = pd.read_csv(file_path, nrows=0, index_col=False)
-            columns = set(df.columns)
+            columns = cls._read_header(file_path)
+            
+            if hasattr(file_path, 'seek'):
+                file_path.seek(0)
             
             return cls._detect_from_columns(columns)
             
         except Exception as e:
             return CSVType.UNKNOWN, 0.0, False
     
+    @staticmethod
+    def _read_header(file_path: Union[str, IO]) -> set:
+        """
+        Read the column names from the first non-blank line of a CSV.
+        
+        Uses the csv module on that one line instead of pandas, so detection
+        costs no parser setup or dtype inference however large the file is.
+        
+        Args:
+            file_path: Path to the CSV file, or an open (text or binary) file object
+            
+        Returns:
+            Set of column names
+        """
+        def read_line(f):
+            line = f.readline()
+            return line.decode('utf-8') if isinstance(line, bytes) else line
+        
+        def first_line(f):
+            # Drop a byte order mark (as pandas does) before looking for blank
+            # lines, so a BOM followed by blank lines isn't taken as the header
+            line = read_line(f).lstrip('\ufeff')
+            while line and not line.strip():
+                line = read_line(f)
+            return line
+        
+        if hasattr(file_path, 'readline'):
+            header = first_line(file_path)
+        else:
+            with open(file_path, encoding='utf-8', newline='') as f:
+                header = first_line(f)
+        return set(next(csv.reader([header]), []))
+    
     @classmethod
     def detect_from_dataframe(cls, df: pd.DataFrame) -> Tuple[CSVType, float, bool]:
         """
@@ -98,31 +136,24 @@ class CSVDetector:
         Returns:
             Tuple of (CSVType, confidence_score, has_categories)
         """
-        scores = {}
-        
-        # Score Chase Credit
-        scores[CSVType.CHASE_CREDIT] = cls._calculate_score(
-            columns, 
-            cls.CHASE_CREDIT_COLUMNS['required'],
-            cls.CHASE_CREDIT_COLUMNS['characteristic'],
-            cls.CHASE_CREDIT_COLUMNS['all']
-        )
-        
-        # Score Chase Debit
-        scores[CSVType.CHASE_DEBIT] = cls._calculate_score(
-            columns,
-            cls.CHASE_DEBIT_COLUMNS['required'],
-            cls.CHASE_DEBIT_COLUMNS['characteristic'],
-            cls.CHASE_DEBIT_COLUMNS['all']
-        )
+        return cls._detect_from_signature(frozenset(columns))
+    
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _detect_from_signature(cls, columns: frozenset) -> Tuple[CSVType, float, bool]:
+        """
+        Score a header against every known format.
         
-        # Score Discover
-        scores[CSVType.DISCOVER] = cls._calculate_score(
-            columns,
-            cls.DISCOVER_COLUMNS['required'],
-            cls.DISCOVER_COLUMNS['characteristic'],
-            cls.DISCOVER_COLUMNS['all']
-        )
+        Cached per header, since every export from a bank has the same columns.
+        """
+        scores = {}
+        for csv_type, signature in cls._signatures():
+            scores[csv_type] = cls._calculate_score(
+                columns,
+                signature['required'],
+                signature['characteristic'],
+                signature['all']
+            )
         
         # Find the best match
         best_type = max(scores, key=scores.get)
@@ -137,6 +168,15 @@ class CSVDetector:
         
         return best_type, best_score, has_categories
     
+    @classmethod
+    def _signatures(cls):
+        """Get the (CSVType, column signature) pairs to score, in tie-break order."""
+        return (
+            (CSVType.CHASE_CREDIT, cls.CHASE_CREDIT_COLUMNS),
+            (CSVType.CHASE_DEBIT, cls.CHASE_DEBIT_COLUMNS),
+            (CSVType.DISCOVER, cls.DISCOVER_COLUMNS),
+        )
+    
     @classmethod
     def _calculate_score(cls, columns: set, required: set, characteristic: set, all_cols: set) -> float:
         """
@@ -1,9 +1,17 @@
 """Discover CSV parser."""
 import pandas as pd
-from datetime import datetime
-from typing import List
+from typing import IO, Iterator, List, Union
 from backend.models.transaction import Transaction, RecurrenceType
 from backend.analytics.expense_classifier import ExpenseClassifier
+from backend.parsers.columns import (
+    CHUNK_ROWS, constant_column, convert_column, iter_rows, parse_amount, parse_any_date, parse_us_date
+)
+
+
+def _report_row_error(error: Exception):
+    """Report a row that could not be parsed (the row is skipped)."""
+    print(f"Error parsing Discover row: {error}")
+
 
 class DiscoverParser:
     """Parser for Discover card CSV files."""
@@ -17,6 +25,16 @@ class DiscoverParser:
         'Category'
     }
     
+    # Column types for read_csv, so pandas skips type inference: cells are read as
+    # text (the parsers convert them), and the low-cardinality columns as categories
+    CSV_DTYPES = {
+        **dict.fromkeys(['Trans. Date', 'Transaction Date', 'Date', 'Trans Date'], str),
+        **dict.fromkeys(['Post Date', 'Posted Date', 'Posting Date'], str),
+        **dict.fromkeys(['Description', 'Merchant', 'Name', 'Payee'], str),
+        **dict.fromkeys(['Amount', 'Transaction Amount', 'Charge'], str),
+        **dict.fromkeys(['Category', 'Type', 'Transaction Type'], 'category'),
+    }
+    
     # Normalize Discover categories to standard categories
     CATEGORY_MAP = {
         'travel/ entertainment': 'Entertainment',
@@ -41,80 +59,90 @@ class DiscoverParser:
     }
     
     @staticmethod
-    def parse(file_path: str, use_csv_categories: bool = False) -> List[Transaction]:
+    def parse(file_path: Union[str, IO], use_csv_categories: bool = False) -> List[Transaction]:
         """
         Parse Discover CSV file and return list of transactions.
         
         Args:
-            file_path: Path to the Discover CSV file
+            file_path: Path to the Discover CSV file, or an open file object
             use_csv_categories: If True, use categories from CSV and skip auto-classification.
                                If False, apply auto-tagging rules.
             
         Returns:
             List of Transaction objects with full classification
         """
-        try:
-            # Read CSV file (index_col=False prevents pandas from using first column as index)
-            df = pd.read_csv(file_path, index_col=False)
-            
-            # Validate columns
-            if not DiscoverParser._validate_columns(df):
-                # Try flexible parsing
-                transactions = DiscoverParser._parse_flexible(df, use_csv_categories)
-                return transactions
-            
-            transactions = []
+        return list(DiscoverParser.parse_iter(file_path, use_csv_categories))
+    
+    @staticmethod
+    def parse_iter(file_path: Union[str, IO], use_csv_categories: bool = False) -> Iterator[Transaction]:
+        """
+        Parse Discover CSV file, yielding each transaction as soon as it is classified.
+        
+        Args:
+            file_path: Path to the Discover CSV file, or an open file object
+            use_csv_categories: If True, use categories from CSV and skip auto-classification.
+                               If False, apply auto-tagging rules.
             
-            for _, row in df.iterrows():
-                try:
-                    # Parse dates
-                    trans_date = datetime.strptime(str(row['Trans. Date']).strip(), '%m/%d/%Y')
-                    post_date = datetime.strptime(str(row['Post Date']).strip(), '%m/%d/%Y')
-                    
-                    # Parse amount - Discover uses positive for charges, negative for credits
-                    # We flip the sign to match budgeting convention: negative = expense, positive = income
-                    amount_str = str(row['Amount']).replace(',', '').replace('$', '').strip()
-                    amount = -float(amount_str)  # Flip sign for credit cards
-                    
-                    # Get and normalize category - only if using CSV categories
-                    raw_category = str(row['Category']).strip() if pd.notna(row['Category']) else 'Other'
-                    if use_csv_categories:
-                        category = DiscoverParser._normalize_category(raw_category)
+        Yields:
+            Transaction objects with full classification
+        """
+        try:
+            # Read the CSV a chunk of rows at a time so large exports are never held
+            # in memory whole (index_col=False prevents pandas from using first column as index)
+            with pd.read_csv(file_path, index_col=False, dtype=DiscoverParser.CSV_DTYPES, engine='c',
+                             chunksize=CHUNK_ROWS) as chunks:
+                for df in chunks:
+                    # Validate columns
+                    if DiscoverParser._validate_columns(df):
+                        transactions = DiscoverParser._parse_standard(df, use_csv_categories)
                     else:
-                        # Set to 'Other' so auto-tagging rules can apply
-                        category = 'Other'
+                        # Try flexible parsing
+                        transactions = DiscoverParser._parse_flexible(df, use_csv_categories)
                     
-                    # Get description
-                    description = str(row['Description']).strip().strip('"')
-                    
-                    # Determine transaction type based on category and amount
-                    trans_type = DiscoverParser._determine_type(raw_category, amount)
-                    
-                    transaction = Transaction(
-                        transaction_date=trans_date,
-                        post_date=post_date,
-                        description=description,
-                        amount=amount,
-                        category=category,
-                        bank='Discover',
-                        type=trans_type,
-                        memo=None,
-                        recurrence=RecurrenceType.ONE_TIME  # Default to one-time
-                    )
-                    transactions.append(transaction)
-                except Exception as e:
-                    print(f"Error parsing Discover row: {e}")
-                    continue
-            
-            # Only apply auto-classification if NOT using CSV categories
-            if not use_csv_categories:
-                return ExpenseClassifier.classify_batch(transactions)
-            
-            return transactions
+                    for t in transactions:
+                        # Only apply auto-classification if NOT using CSV categories
+                        if not use_csv_categories:
+                            ExpenseClassifier.classify(t)
+                        
+                        yield t
             
         except Exception as e:
             raise Exception(f"Error parsing Discover CSV: {str(e)}")
     
+    @staticmethod
+    def _parse_standard(df: pd.DataFrame, use_csv_categories: bool = False) -> Iterator[Transaction]:
+        """Parse the standard Discover CSV format."""
+        # Convert whole columns up front; each distinct value is parsed once
+        trans_dates = convert_column(df['Trans. Date'], parse_us_date)
+        post_dates = convert_column(df['Post Date'], parse_us_date)
+        # Discover uses positive for charges, negative for credits
+        # We flip the sign to match budgeting convention: negative = expense, positive = income
+        amounts = convert_column(df['Amount'], lambda v: -parse_amount(v))
+        raw_categories = convert_column(df['Category'], lambda v: str(v).strip() if pd.notna(v) else 'Other')
+        descriptions = convert_column(df['Description'], lambda v: str(v).strip().strip('"'))
+        
+        for trans_date, post_date, amount, raw_category, description in iter_rows(
+            trans_dates, post_dates, amounts, raw_categories, descriptions, on_error=_report_row_error
+        ):
+            # Get and normalize category - only if using CSV categories
+            if use_csv_categories:
+                category = DiscoverParser._normalize_category(raw_category)
+            else:
+                # Set to 'Other' so auto-tagging rules can apply
+                category = 'Other'
+            
+            yield Transaction(
+                transaction_date=trans_date,
+                post_date=post_date,
+                description=description,
+                amount=amount,
+                category=category,
+                bank='Discover',
+                type=DiscoverParser._determine_type(raw_category, amount),
+                memo=None,
+                recurrence=RecurrenceType.ONE_TIME  # Default to one-time
+            )
+    
     @staticmethod
     def _validate_columns(df: pd.DataFrame) -> bool:
         """Validate that all required columns are present."""
@@ -123,9 +151,8 @@ class DiscoverParser:
         return required_columns.issubset(df_columns)
     
     @staticmethod
-    def _parse_flexible(df: pd.DataFrame, use_csv_categories: bool = False) -> List[Transaction]:
+    def _parse_flexible(df: pd.DataFrame, use_csv_categories: bool = False) -> Iterator[Transaction]:
         """Flexibly parse Discover CSV by finding common column names."""
-        transactions = []
         columns = df.columns.tolist()
         
         # Map possible column names
@@ -150,63 +177,42 @@ class DiscoverParser:
         if not all([date_col, desc_col, amount_col]):
             raise ValueError("Could not find required columns in Discover CSV")
         
-        for _, row in df.iterrows():
-            try:
-                # Parse date
-                date_str = str(row[date_col]).strip()
-                try:
-                    trans_date = datetime.strptime(date_str, '%m/%d/%Y')
-                except:
-                    trans_date = datetime.strptime(date_str, '%Y-%m-%d')
-                
-                # Parse post date (use trans date if not available)
-                if post_col and pd.notna(row[post_col]):
-                    post_str = str(row[post_col]).strip()
-                    try:
-                        post_date = datetime.strptime(post_str, '%m/%d/%Y')
-                    except:
-                        post_date = datetime.strptime(post_str, '%Y-%m-%d')
-                else:
-                    post_date = trans_date
-                
-                # Parse amount - flip sign for credit card convention
-                amount_str = str(row[amount_col]).replace(',', '').replace('$', '').strip()
-                amount = -float(amount_str)  # Flip sign for credit cards
-                
-                # Get description
-                description = str(row[desc_col]).strip()
-                
-                # Get category - only if using CSV categories
-                if use_csv_categories:
-                    raw_category = 'Other'
-                    if category_col and pd.notna(row[category_col]):
-                        raw_category = str(row[category_col]).strip()
-                    category = DiscoverParser._normalize_category(raw_category)
-                else:
-                    # Set to 'Other' so auto-tagging rules can apply
-                    category = 'Other'
-                
-                transaction = Transaction(
-                    transaction_date=trans_date,
-                    post_date=post_date,
-                    description=description,
-                    amount=amount,
-                    category=category,
-                    bank='Discover',
-                    type=None,
-                    memo=None,
-                    recurrence=RecurrenceType.ONE_TIME  # Default to one-time
-                )
-                transactions.append(transaction)
-            except Exception as e:
-                print(f"Error parsing Discover row: {e}")
-                continue
+        trans_dates = convert_column(df[date_col], parse_any_date)
+        # Use trans date if post date is not available
+        if post_col:
+            post_dates = convert_column(df[post_col], lambda v: parse_any_date(v) if pd.notna(v) else None)
+        else:
+            post_dates = constant_column(len(df), None)
+        # Flip sign for credit card convention
+        amounts = convert_column(df[amount_col], lambda v: -parse_amount(v))
+        descriptions = convert_column(df[desc_col], lambda v: str(v).strip())
         
-        # Only apply auto-classification if NOT using CSV categories
-        if not use_csv_categories:
-            return ExpenseClassifier.classify_batch(transactions)
+        # Get category - only if using CSV categories
+        if use_csv_categories and category_col:
+            categories = convert_column(
+                df[category_col],
+                lambda v: DiscoverParser._normalize_category(str(v).strip() if pd.notna(v) else 'Other')
+            )
+        elif use_csv_categories:
+            categories = constant_column(len(df), DiscoverParser._normalize_category('Other'))
+        else:
+            # Set to 'Other' so auto-tagging rules can apply
+            categories = constant_column(len(df), 'Other')
         
-        return transactions
+        for trans_date, post_date, amount, description, category in iter_rows(
+            trans_dates, post_dates, amounts, descriptions, categories, on_error=_report_row_error
+        ):
+            yield Transaction(
+                transaction_date=trans_date,
+                post_date=post_date if post_date is not None else trans_date,
+                description=description,
+                amount=amount,
+                category=category,
+                bank='Discover',
+                type=None,
+                memo=None,
+                recurrence=RecurrenceType.ONE_TIME  # Default to one-time
+            )
     
     @staticmethod
     def _normalize_category(raw_category: str) -> str:
@@ -5,9 +5,13 @@ import sys
 import ssl
 import certifi
 import os
+import time
 from google.oauth2.service_account import Credentials
 from typing import List
+import numpy as np
+from backend.models.storage import loads_json
 from backend.models.transaction import Transaction
+from backend.analytics.transaction_table import TransactionTable
 from backend.config import Config, BASE_DIR
 
 # Set up logger
@@ -38,10 +42,19 @@ class SheetsClient:
         'https://www.googleapis.com/auth/drive'
     ]
     
+    # Authorized (client, spreadsheet) pairs shared by all instances, keyed by
+    # credentials file (path and version) and sheet ID; dropped when a Sheets
+    # API call on them fails
+    _connections = {}
+    
+    # Parsed service account JSON of the current credentials file version
+    _credentials_info = {}
+    
     def __init__(self):
         """Initialize the Google Sheets client."""
         self.client = None
         self.spreadsheet = None
+        self._connection_key = None  # Key of this client's entry in _connections
         self._connect()
     
     def _connect(self):
@@ -56,11 +69,23 @@ class SheetsClient:
             return
         
         try:
+            # Reuse an earlier connection made with the same credentials and sheet
+            stat = Config.GOOGLE_CREDENTIALS_PATH.stat()
+            connection_key = (str(Config.GOOGLE_CREDENTIALS_PATH), stat.st_mtime_ns, stat.st_size, Config.GOOGLE_SHEETS_ID)
+            self._connection_key = connection_key
+            connection = SheetsClient._connections.get(connection_key)
+            if connection is not None:
+                self.client, self.spreadsheet = connection
+                _log_and_flush("SheetsClient: Reusing existing connection")
+                return
+            
             _log_and_flush("SheetsClient: Loading credentials...")
-            credentials = Credentials.from_service_account_file(
-                str(Config.GOOGLE_CREDENTIALS_PATH),
-                scopes=self.SCOPES
-            )
+            credentials_key = connection_key[:3]
+            info = SheetsClient._credentials_info.get(credentials_key)
+            if info is None:
+                info = loads_json(Config.GOOGLE_CREDENTIALS_PATH.read_bytes())
+                SheetsClient._credentials_info = {credentials_key: info}
+            credentials = Credentials.from_service_account_info(info, scopes=self.SCOPES)
             _log_and_flush("SheetsClient: Authorizing with gspread...")
             self.client = gspread.authorize(credentials)
             
@@ -68,10 +93,11 @@ class SheetsClient:
                 try:
                     _log_and_flush("SheetsClient: Opening spreadsheet by key...")
                     # Add a small delay to ensure network stack is ready
-                    import time
+                    # (only paid on a new connection)
                     time.sleep(0.5)
                     _log_and_flush("SheetsClient: Making API call to Google...")
                     self.spreadsheet = self.client.open_by_key(Config.GOOGLE_SHEETS_ID)
+                    SheetsClient._connections[connection_key] = (self.client, self.spreadsheet)
                     _log_and_flush("SheetsClient: Connected successfully!")
                 except gspread.exceptions.APIError as api_error:
                     error_details = str(api_error)
@@ -107,6 +133,24 @@ class SheetsClient:
         """Check if client is connected."""
         return self.client is not None and self.spreadsheet is not None
     
+    def discard_connection_on_error(self, error: Exception):
+        """
+        Stop sharing this client's connection if a Sheets API call on it failed.
+        
+        A cached connection outlives revoked credentials and unshared or
+        deleted sheets, so an API error makes the next SheetsClient reconnect
+        (and report why) instead of reusing the dead spreadsheet.
+        
+        Args:
+            error: The exception raised by a call on self.spreadsheet
+        """
+        if not isinstance(error, gspread.exceptions.APIError):
+            return
+        cached = SheetsClient._connections.get(self._connection_key)
+        if cached is not None and cached[1] is self.spreadsheet:
+            del SheetsClient._connections[self._connection_key]
+            _log_and_flush(f"SheetsClient: Dropped cached connection after API error: {error}")
+    
     def _get_or_create_worksheet(self, title: str, headers: List[str]):
         """Get existing worksheet or create new one. Ensures headers are present."""
         try:
@@ -123,6 +167,57 @@ class SheetsClient:
         
         return worksheet
     
+    def _find_or_add_worksheet(self, title: str, headers: List[str]):
+        """Get a worksheet by title, returning (worksheet, created); new sheets are empty."""
+        try:
+            return self.spreadsheet.worksheet(title), False
+        except gspread.exceptions.WorksheetNotFound:
+            return self.spreadsheet.add_worksheet(title=title, rows=1000, cols=len(headers)), True
+    
+    def _rewrite_worksheet(self, title: str, headers: List[str], rows: List[list]):
+        """
+        Replace a worksheet's contents with a header row and data rows.
+        
+        The header and data go out in a single append request after the clear,
+        instead of separate header checks and appends, to save round trips.
+        """
+        worksheet, created = self._find_or_add_worksheet(title, headers)
+        if not created:
+            worksheet.clear()
+        worksheet.append_rows([headers] + rows)
+        return worksheet
+    
+    def _read_worksheet_columns(self, title: str, headers: List[str], columns: List[str]):
+        """
+        Get or create a worksheet and read some of its columns in one request.
+        
+        Only the requested columns are downloaded, rather than the whole sheet.
+        
+        Args:
+            title: Worksheet title
+            headers: Expected header row (checked against cell A1)
+            columns: Column letters to read, starting with 'A', e.g. ['A', 'C']
+        
+        Returns:
+            Tuple of (worksheet, one list of data-row values per requested
+            column, padded to the same length, rows to write before any new
+            data: [headers] if the header row is missing)
+        """
+        worksheet, created = self._find_or_add_worksheet(title, headers)
+        if created:
+            return worksheet, [[] for _ in columns], [headers]
+        
+        ranges = worksheet.batch_get([f'{c}1:{c}' for c in columns], major_dimension='COLUMNS')
+        values = [r[0] if r else [] for r in ranges]
+        if not values[0] or values[0][0] != headers[0]:
+            # Sheet is empty or has wrong headers - clear it and start over
+            worksheet.clear()
+            return worksheet, [[] for _ in columns], [headers]
+        
+        # The API drops trailing empty cells, so pad the columns back to one length
+        row_count = max(map(len, values))
+        return worksheet, [v[1:] + [''] * (row_count - len(v)) for v in values], []
+    
     def sync_transactions(self, transactions: List[Transaction], clear_first: bool = False) -> dict:
         """
         Sync transactions to Google Sheets.
@@ -151,74 +246,77 @@ class SheetsClient:
                 'Note'               # User notes
             ]
             
-            # Sync to "All Transactions" sheet
-            all_transactions_sheet = self._get_or_create_worksheet('All Transactions', headers)
+            # Format each transaction once, collecting the rows for the per-bank sheets as we go
+            all_rows = []
+            bank_rows = {'chase': [], 'discover': []}
+            for t in transactions:
+                row = [str(val) for val in t.to_sheet_row()]
+                all_rows.append(row)
+                rows_for_bank = bank_rows.get(t.bank)
+                if rows_for_bank is not None:
+                    rows_for_bank.append(row)
             
+            # Sync to "All Transactions" sheet
             if clear_first:
                 # Clear and re-sync all data
-                all_transactions_sheet.clear()
-                all_transactions_sheet.append_row(headers)
-                new_rows = [[str(val) for val in t.to_sheet_row()] for t in transactions]
-                if new_rows:
-                    all_transactions_sheet.append_rows(new_rows)
+                new_rows = all_rows
+                self._rewrite_worksheet('All Transactions', headers, new_rows)
                 synced_count = len(new_rows)
             else:
                 # Incremental sync - avoid duplicates based on key fields only
                 # (date, description, amount, bank) - NOT category or other fields
-                existing_data = all_transactions_sheet.get_all_values()
+                # Only the key columns are downloaded: A=Transaction Date, C=Description, D=Amount, F=Bank
+                all_transactions_sheet, key_columns, header_rows = self._read_worksheet_columns(
+                    'All Transactions', headers, ['A', 'C', 'D', 'F']
+                )
                 
-                # Create a set of existing transaction keys (date, description, amount, bank)
-                # Column indices: 0=Transaction Date, 2=Description, 3=Amount, 5=Bank
-                existing_keys = set()
-                for row in existing_data[1:]:  # Skip header
-                    if len(row) >= 6:
-                        # Normalize amount for comparison (remove formatting)
+                # Normalize amounts for comparison to whole cents (remove formatting),
+                # once per distinct amount string since the sheet repeats amounts a lot
+                normalized_amounts = {}
+                
+                def normalize_amount(amount):
+                    normalized = normalized_amounts.get(amount)
+                    if normalized is None:
                         try:
-                            amount = str(float(row[3]))
-                        except (ValueError, IndexError):
-                            amount = row[3] if len(row) > 3 else ''
-                        key = (row[0], row[2], amount, row[5])  # date, description, amount, bank
-                        existing_keys.add(key)
+                            normalized = round(float(amount), 2)
+                        except ValueError:
+                            normalized = amount
+                        normalized_amounts[amount] = normalized
+                    return normalized
+                
+                # Create a set of existing transaction keys (date, description, amount, bank)
+                dates, descriptions, amounts, banks = key_columns
+                existing_keys = {
+                    (date, description, normalize_amount(amount), bank)
+                    for date, description, amount, bank in zip(dates, descriptions, amounts, banks)
+                }
                 
                 # Prepare new rows, checking against key fields only
                 new_rows = []
                 duplicate_count = 0
-                for transaction in transactions:
-                    row = [str(val) for val in transaction.to_sheet_row()]
+                for transaction, row in zip(transactions, all_rows):
                     # Create key from this transaction
-                    key = (row[0], row[2], str(float(row[3])), row[5])
+                    key = (row[0], row[2], round(float(transaction.amount), 2), row[5])
                     if key not in existing_keys:
                         new_rows.append(row)
                         existing_keys.add(key)  # Prevent duplicates within the batch
                     else:
                         duplicate_count += 1
                 
-                # Append new rows
-                if new_rows:
-                    all_transactions_sheet.append_rows(new_rows)
+                # Append new rows, along with the header row if the sheet lacked one
+                if header_rows or new_rows:
+                    all_transactions_sheet.append_rows(header_rows + new_rows)
                 synced_count = len(new_rows)
             
             # Sync by bank
-            chase_transactions = [t for t in transactions if t.bank == 'chase']
-            discover_transactions = [t for t in transactions if t.bank == 'discover']
-            
-            if chase_transactions:
-                chase_sheet = self._get_or_create_worksheet('Chase', headers)
-                if clear_first:
-                    chase_sheet.clear()
-                    chase_sheet.append_row(headers)
-                chase_rows = [[str(val) for val in t.to_sheet_row()] for t in chase_transactions]
-                if chase_rows:
-                    chase_sheet.append_rows(chase_rows)
-            
-            if discover_transactions:
-                discover_sheet = self._get_or_create_worksheet('Discover', headers)
+            for title, bank in (('Chase', 'chase'), ('Discover', 'discover')):
+                rows = bank_rows[bank]
+                if not rows:
+                    continue
                 if clear_first:
-                    discover_sheet.clear()
-                    discover_sheet.append_row(headers)
-                discover_rows = [[str(val) for val in t.to_sheet_row()] for t in discover_transactions]
-                if discover_rows:
-                    discover_sheet.append_rows(discover_rows)
+                    self._rewrite_worksheet(title, headers, rows)
+                else:
+                    self._get_or_create_worksheet(title, headers).append_rows(rows)
             
             return {
                 'success': True,
@@ -228,6 +326,7 @@ class SheetsClient:
             }
             
         except Exception as e:
+            self.discard_connection_on_error(e)
             return {'error': f'Error syncing to Google Sheets: {str(e)}'}
     
     def load_transactions(self, start_date=None) -> dict:
@@ -264,6 +363,29 @@ class SheetsClient:
             if len(all_data) <= 1:  # Only header or empty
                 return {'transactions': [], 'message': 'No transactions found in Google Sheets'}
             
+            from datetime import datetime
+            from backend.models.transaction import NecessityLevel, RecurrenceType
+            
+            # Each day appears on many rows, so parse every distinct date string once
+            parsed_dates = {}
+            
+            def parse_date(date_str):
+                parsed = parsed_dates.get(date_str)
+                if parsed is None:
+                    parsed = parsed_dates[date_str] = datetime.strptime(date_str, '%Y-%m-%d')
+                return parsed
+            
+            # Decide the start_date filter once per distinct transaction date, so
+            # rows outside the range are dropped without building anything for them
+            skipped_dates = set()
+            if start_date is not None:
+                for date_str in {row[0] for row in all_data[1:] if len(row) >= 6}:
+                    try:
+                        if parse_date(date_str).date() < start_date:
+                            skipped_dates.add(date_str)
+                    except ValueError:
+                        pass  # Reported as a row error below
+            
             # Parse rows (skip header)
             transactions = []
             errors = []
@@ -276,35 +398,36 @@ class SheetsClient:
                     if len(row) < 6:  # Need at least the basic columns
                         continue
                     
-                    from datetime import datetime
-                    from backend.models.transaction import NecessityLevel, RecurrenceType
+                    # Filter by start_date if provided
+                    if row[0] in skipped_dates:
+                        skipped_by_date += 1
+                        continue
                     
-                    # Parse dates
-                    transaction_date = datetime.strptime(row[0], '%Y-%m-%d')
+                    # Pad missing optional columns once instead of guarding every field
+                    if len(row) < 9:
+                        row = row + [''] * (9 - len(row))
+                    date_str, post_str, description, amount_str, category, bank, necessity, recurrence, note = row[:9]
                     
-                    # Filter by start_date if provided
-                    if start_date is not None:
-                        if transaction_date.date() < start_date:
-                            skipped_by_date += 1
-                            continue
+                    # Parse dates
+                    transaction_date = parse_date(date_str)
                     
-                    post_date = datetime.strptime(row[1], '%Y-%m-%d') if row[1] else transaction_date
+                    post_date = parse_date(post_str) if post_str else transaction_date
                     
                     # Parse amount
-                    amount = float(row[3]) if row[3] else 0.0
+                    amount = float(amount_str) if amount_str else 0.0
                     
                     # Create transaction object
                     transaction = Transaction(
                         transaction_date=transaction_date,
                         post_date=post_date,
-                        description=row[2],
+                        description=description,
                         amount=amount,
-                        category=row[4] if len(row) > 4 and row[4] else 'Other',
-                        bank=row[5] if len(row) > 5 and row[5] else 'unknown',
+                        category=category or 'Other',
+                        bank=bank or 'unknown',
                         # Enhanced classification columns
-                        necessity=row[6] if len(row) > 6 and row[6] else NecessityLevel.UNKNOWN,
-                        recurrence=row[7] if len(row) > 7 and row[7] else RecurrenceType.UNKNOWN,
-                        note=row[8] if len(row) > 8 and row[8] else None
+                        necessity=necessity or NecessityLevel.UNKNOWN,
+                        recurrence=recurrence or RecurrenceType.UNKNOWN,
+                        note=note or None
                     )
                     transactions.append(transaction)
                     
@@ -323,6 +446,7 @@ class SheetsClient:
             }
             
         except Exception as e:
+            self.discard_connection_on_error(e)
             import traceback
             _log_and_flush(f"SheetsClient: Exception in load_transactions: {str(e)}", 'error')
             _log_and_flush(traceback.format_exc(), 'error')
@@ -342,32 +466,34 @@ class SheetsClient:
             return {'error': 'Not connected to Google Sheets'}
         
         try:
-            # Group by month
-            from collections import defaultdict
-            monthly_data = defaultdict(lambda: {'spent': 0, 'income': 0, 'count': 0})
-            
-            for t in transactions:
-                month_key = t.month_year
-                if t.is_expense:
-                    monthly_data[month_key]['spent'] += abs(t.amount)
-                else:
-                    monthly_data[month_key]['income'] += t.amount
-                monthly_data[month_key]['count'] += 1
+            # Group by month with one bincount per column over the transaction table
+            table = TransactionTable(transactions)
+            months = np.fromiter(
+                (t.transaction_date.year * 12 + t.transaction_date.month - 1 for t in transactions),
+                dtype=np.int64,
+                count=len(transactions)
+            )
+            present, month_codes = np.unique(months, return_inverse=True)
+            income_cents = np.bincount(month_codes, weights=np.where(table.is_expense, 0, table.cents),
+                                       minlength=len(present))
+            spent_cents = np.bincount(month_codes, weights=np.where(table.is_expense, table.abs_cents, 0),
+                                      minlength=len(present))
+            counts = np.bincount(month_codes, minlength=len(present))
             
             # Prepare summary data
             headers = ['Month', 'Transactions', 'Income', 'Spent', 'Net', 'Savings Rate']
             rows = []
             
-            for month in sorted(monthly_data.keys(), reverse=True):
-                data = monthly_data[month]
-                income = round(data['income'], 2)
-                spent = round(data['spent'], 2)
+            for i in reversed(range(len(present))):
+                year, month = divmod(int(present[i]), 12)
+                income = round(float(income_cents[i]) / 100, 2)
+                spent = round(float(spent_cents[i]) / 100, 2)
                 net = round(income - spent, 2)
                 savings_rate = f"{(net / income * 100):.1f}%" if income > 0 else "N/A"
                 
                 rows.append([
-                    month,
-                    data['count'],
+                    f'{year:04d}-{month + 1:02d}',
+                    int(counts[i]),
                     income,
                     spent,
                     net,
@@ -375,14 +501,12 @@ class SheetsClient:
                 ])
             
             # Create/update worksheet
-            summary_sheet = self._get_or_create_worksheet('Monthly Summary', headers)
-            summary_sheet.clear()
-            summary_sheet.append_row(headers)
-            summary_sheet.append_rows(rows)
+            self._rewrite_worksheet('Monthly Summary', headers, rows)
             
             return {'success': True, 'months': len(rows)}
             
         except Exception as e:
+            self.discard_connection_on_error(e)
             return {'error': f'Error creating monthly summary: {str(e)}'}
     
     def sync_period_notes(self, notes: dict) -> dict:
@@ -402,13 +526,6 @@ class SheetsClient:
         try:
             headers = ['Period', 'Type', 'Date Range', 'Analysis Notes']
             
-            # Get or create the Period Notes worksheet
-            notes_sheet = self._get_or_create_worksheet('Period Notes', headers)
-            
-            # Clear and rebuild
-            notes_sheet.clear()
-            notes_sheet.append_row(headers)
-            
             rows = []
             for period_key, content in sorted(notes.items(), reverse=True):
                 if not content or not content.strip():
@@ -447,8 +564,8 @@ class SheetsClient:
                     content
                 ])
             
-            if rows:
-                notes_sheet.append_rows(rows)
+            # Clear and rebuild the Period Notes worksheet
+            self._rewrite_worksheet('Period Notes', headers, rows)
             
             return {
                 'success': True,
@@ -457,5 +574,6 @@ class SheetsClient:
             }
             
         except Exception as e:
+            self.discard_connection_on_error(e)
             return {'error': f'Error syncing period notes: {str(e)}'}
 
@@ -8,20 +8,22 @@ and shows a system tray icon instead.
 """
 import os
 import sys
-import platform
+import socket
 import threading
-import webbrowser
+import time
 import logging
+import logging.handlers
 from pathlib import Path
 
-# Resolve the base directory:
+# Resolve the base directory (abspath rather than Path.resolve(), which asks
+# the filesystem and can stall on network drives):
 # - Frozen (PyInstaller): folder containing the exe
 # - Source: folder containing this run.py
 if getattr(sys, "frozen", False):
-    BASE_DIR = Path(sys.executable).resolve().parent
+    BASE_DIR = Path(os.path.dirname(os.path.abspath(sys.executable)))
     IS_FROZEN = True
 else:
-    BASE_DIR = Path(__file__).resolve().parent
+    BASE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
     IS_FROZEN = False
 
 # Force working directory to the base directory so bundled deps load cleanly
@@ -34,11 +36,14 @@ if str(BASE_DIR) not in sys.path:
 # Set up logging to file when running as frozen executable (no console)
 if IS_FROZEN:
     log_file = BASE_DIR / 'spendsight.log'
+    # delay=True opens the log file on the first write rather than at import
+    file_handler = logging.FileHandler(log_file, encoding='utf-8', delay=True)
+    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
     logging.basicConfig(
         level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
+            # Batch records into few writes; warnings and errors go out immediately
+            logging.handlers.MemoryHandler(capacity=200, flushLevel=logging.WARNING, target=file_handler),
         ]
     )
 else:
@@ -49,13 +54,28 @@ else:
 
 logger = logging.getLogger(__name__)
 
-# Import Flask app
-from backend.app import app, needs_setup
-from backend.config import Config
+# The packaged desktop app only serves its own browser; binding loopback
+# also avoids the Windows Firewall prompt a wildcard bind triggers
+SERVER_HOST = '127.0.0.1' if IS_FROZEN else '0.0.0.0'
+
+# Flask app, setup check and config, imported on first use (like the server
+# below) so the tray icon can appear before the backend has loaded
+_backend = None
+
+
+def _backend_mod():
+    """Get (app, needs_setup, Config), importing the backend on first call."""
+    global _backend
+    if _backend is None:
+        from backend.app import app, needs_setup
+        from backend.config import Config
+        _backend = (app, needs_setup, Config)
+    return _backend
 
 
 def get_url():
     """Get the URL for the app."""
+    _, needs_setup, Config = _backend_mod()
     if needs_setup():
         return f"http://localhost:{Config.PORT}/setup"
     return f"http://localhost:{Config.PORT}"
@@ -65,19 +85,85 @@ def open_browser():
     """Open the app in the default web browser."""
     url = get_url()
     logger.info(f"Opening browser: {url}")
+    
+    # Hand the URL straight to the OS's default handler rather than going
+    # through webbrowser's search for a browser
+    try:
+        if sys.platform == 'win32':
+            os.startfile(url)
+            return
+        import subprocess
+        command = 'open' if sys.platform == 'darwin' else 'xdg-open'
+        subprocess.Popen([command, url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    except OSError as e:
+        logger.warning(f"Could not open browser directly: {e}, falling back to webbrowser")
+    
+    import webbrowser
     webbrowser.open(url)
 
 
+def wait_for_port(port: int, timeout: float = 5.0) -> bool:
+    """
+    Wait until the server accepts connections on a local port.
+    
+    Args:
+        port: Port the server listens on
+        timeout: Seconds to wait before giving up
+        
+    Returns:
+        True if the port accepted a connection before the timeout
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # A fresh socket per attempt; a refused socket can't be reused
+        with socket.socket() as s:
+            s.settimeout(0.05)
+            if s.connect_ex(('127.0.0.1', port)) == 0:
+                return True
+        time.sleep(0.02)
+    return False
+
+
+def open_browser_when_ready():
+    """Open the browser as soon as the server is up (or after the wait times out)."""
+    _, _, Config = _backend_mod()
+    if not wait_for_port(Config.PORT):
+        logger.warning(f"Server not reachable on port {Config.PORT}, opening browser anyway")
+    open_browser()
+
+
 def run_flask_server():
     """Run the Flask server in a thread."""
+    app, _, Config = _backend_mod()
     logger.info(f"Starting Flask server on port {Config.PORT}")
+    
+    # Optional production server; falls back to Flask's threaded server
+    try:
+        import waitress
+    except ImportError:
+        waitress = None
+    
+    if IS_FROZEN and waitress is not None:
+        # Pure-Python server for the packaged app: a fixed pool of worker
+        # threads behind an async I/O loop, and no native deps to bundle
+        waitress.serve(
+            app,
+            host=SERVER_HOST,
+            port=Config.PORT,
+            threads=8,
+            channel_timeout=30,
+            _quiet=True
+        )
+        return
+    
     # Suppress Flask's default logging when running as frozen app
     if IS_FROZEN:
         import logging as flask_logging
         flask_logging.getLogger('werkzeug').setLevel(flask_logging.ERROR)
     
     app.run(
-        host='0.0.0.0',
+        host=SERVER_HOST,
         port=Config.PORT,
         debug=False,  # Must be False for threading
         use_reloader=False,
@@ -85,21 +171,74 @@ def run_flask_server():
     )
 
 
-def run_with_tray():
-    """Run the app with a system tray icon (for frozen executable)."""
+# Tray icon after conversion and resizing, reused while its source file is unchanged
+ICON_CACHE_DIR = BASE_DIR / '.cache'
+
+
+# Width and height of the generated fallback tray icon
+DEFAULT_ICON_SIZE = 32
+
+
+def _icon_cache_meta(icon_path: Path) -> str:
+    """Identify a version of the icon source file by its path, size and mtime."""
+    stat = icon_path.stat()
+    return f"{os.path.abspath(icon_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def load_cached_icon(icon_path: Path):
+    """
+    Load the prepared tray icon cached for this source file, if any.
+    
+    Returns:
+        The RGBA tray image, or None if there is no up-to-date cache
+    """
+    from PIL import Image
+    
     try:
-        import pystray
-        from PIL import Image
-    except ImportError:
-        logger.error("pystray or Pillow not installed, falling back to console mode")
-        run_console_mode()
-        return
+        meta = (ICON_CACHE_DIR / 'tray_icon.meta').read_text(encoding='utf-8').split('\n')
+        if meta[0] != _icon_cache_meta(icon_path):
+            return None
+        width, height = map(int, meta[1].split('x'))
+        buf = (ICON_CACHE_DIR / 'tray_icon.rgba').read_bytes()
+        if len(buf) != width * height * 4:
+            return None
+        return Image.frombuffer('RGBA', (width, height), buf, 'raw', 'RGBA', 0, 1)
+    except Exception:
+        return None
+
+
+def save_cached_icon(icon_path: Path, icon_image):
+    """Cache the prepared tray icon's pixels for the next launch."""
+    try:
+        ICON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        meta = f"{_icon_cache_meta(icon_path)}\n{icon_image.size[0]}x{icon_image.size[1]}"
+        # Pixels first and metadata last, so the metadata never describes a partial write
+        for name, data in (('tray_icon.rgba', icon_image.tobytes()), ('tray_icon.meta', meta.encode('utf-8'))):
+            tmp_path = ICON_CACHE_DIR / (name + '.tmp')
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, ICON_CACHE_DIR / name)
+    except Exception as e:
+        logger.warning(f"Could not cache tray icon: {e}")
+
+
+def find_icon_path():
+    """
+    Find the tray icon file.
     
-    # Find icon file - check multiple locations
-    # Prefer ICO format for Windows system tray (better compatibility)
-    # For PyInstaller bundles, check sys._MEIPASS first (where bundled data is extracted)
-    icon_path = None
+    Returns:
+        Path to the icon, or None if no candidate exists
+    """
+    # Frozen builds record where run.spec bundled the icon, so there's nothing to probe
+    if hasattr(sys, '_MEIPASS'):
+        try:
+            from _bundle_paths import TRAY_ICON_REL
+            return Path(sys._MEIPASS) / TRAY_ICON_REL
+        except ImportError:
+            pass
     
+    # Otherwise check multiple locations
+    # Prefer ICO format for Windows system tray (better compatibility)
+    # For PyInstaller bundles, check sys._MEIPASS first (the bundle's _internal folder)
     # Build list of paths to check
     possible_paths = []
     
@@ -119,29 +258,74 @@ def run_with_tray():
         BASE_DIR / 'frontend' / 'static' / 'spendsighticon.png',
     ])
     
+    # List each candidate directory once rather than stat-ing every path,
+    # then take the first candidate present, in priority order
+    dir_files = {}
     for path in possible_paths:
-        if path.exists():
-            icon_path = path
-            logger.info(f"Found icon file: {icon_path}")
-            break
+        if path.parent not in dir_files:
+            try:
+                with os.scandir(path.parent) as entries:
+                    dir_files[path.parent] = {e.name for e in entries if e.is_file()}
+            except OSError:
+                dir_files[path.parent] = set()
+        if path.name in dir_files[path.parent]:
+            return path
+    return None
+
+
+def run_with_tray():
+    """Run the app with a system tray icon (for frozen executable)."""
+    try:
+        import pystray
+        from PIL import Image
+    except ImportError:
+        logger.error("pystray or Pillow not installed, falling back to console mode")
+        run_console_mode()
+        return
     
-    # Create icon image
+    # Start Flask server in background thread; the backend loads there while
+    # the tray icon is prepared below
+    server_thread = threading.Thread(target=run_flask_server, daemon=True)
+    server_thread.start()
+    
+    icon_path = find_icon_path()
     if icon_path:
+        logger.info(f"Found icon file: {icon_path}")
+    
+    # Create icon image
+    icon_image = load_cached_icon(icon_path) if icon_path else None
+    if icon_image is not None:
+        logger.info(f"Loaded cached tray icon for: {icon_path}")
+    elif icon_path:
         try:
-            icon_image = Image.open(icon_path)
-            logger.info(f"Loaded icon: size={icon_image.size}, mode={icon_image.mode}")
-            
-            # Convert to RGBA for proper transparency support
-            if icon_image.mode != 'RGBA':
-                icon_image = icon_image.convert('RGBA')
-            
-            # For ICO files, PIL loads them at their largest size, resize for tray
-            # Windows system tray typically uses 16x16 or 32x32
-            if icon_image.size[0] > 64:
-                icon_image = icon_image.resize((64, 64), Image.Resampling.LANCZOS)
-                logger.info(f"Resized icon to 64x64 for system tray")
+            # Decode inside the with block so the file is closed before the tray
+            # icon takes the image
+            with Image.open(icon_path) as source:
+                source.load()
+                icon_image = source
+                logger.info(f"Loaded icon: size={icon_image.size}, mode={icon_image.mode}")
+                
+                # Convert to RGBA for proper transparency support
+                if icon_image.mode != 'RGBA':
+                    icon_image = icon_image.convert('RGBA')
+                
+                # For ICO files, PIL loads them at their largest size, resize for tray
+                # Windows system tray typically uses 16x16 or 32x32
+                width, height = icon_image.size
+                if width > 64:
+                    if width == height and width % 64 == 0:
+                        # Whole-number downscale (e.g. 256 -> 64): a box filter is
+                        # much cheaper than LANCZOS and looks the same at tray size
+                        icon_image = icon_image.reduce(width // 64)
+                    else:
+                        icon_image = icon_image.resize((64, 64), Image.Resampling.LANCZOS)
+                    logger.info(f"Resized icon to 64x64 for system tray")
+                
+                if icon_image is source:
+                    icon_image = source.copy()  # Detach from the closed source
             
             logger.info(f"Loaded tray icon from: {icon_path}")
+            save_cached_icon(icon_path, icon_image)
         except Exception as e:
             logger.warning(f"Could not load icon from {icon_path}: {e}, using generated icon")
             icon_image = create_default_icon()
@@ -149,16 +333,12 @@ def run_with_tray():
         logger.info("Icon file not found, using generated icon")
         icon_image = create_default_icon()
     
-    # Start Flask server in background thread
-    server_thread = threading.Thread(target=run_flask_server, daemon=True)
-    server_thread.start()
-    
-    # Wait a moment for server to start
-    import time
-    time.sleep(1.5)
-    
-    # Auto-open browser
-    open_browser()
+    def start_app(icon):
+        """Show the tray icon, then open the browser once the server is up."""
+        icon.visible = True
+        
+        # Auto-open browser once the server is listening
+        open_browser_when_ready()
     
     def on_open(icon, item):
         """Open browser when clicked."""
@@ -168,6 +348,8 @@ def run_with_tray():
         """Quit the application."""
         logger.info("Shutting down Spendsight...")
         icon.stop()
+        # os._exit skips atexit, so flush the buffered log records first
+        logging.shutdown()
         # Force exit since Flask server is in a daemon thread
         os._exit(0)
     
@@ -187,15 +369,40 @@ def run_with_tray():
     )
     
     logger.info("System tray icon created, app is running")
-    icon.run()
+    # pystray calls start_app on its own thread once the icon is ready
+    icon.run(setup=start_app)
 
 
 def create_default_icon():
     """Create a simple default icon if the icon file is not found."""
+    from PIL import Image
+    
+    # Reuse the pixels drawn on an earlier launch, skipping PIL.ImageDraw
+    cache_path = ICON_CACHE_DIR / 'default_icon.rgba'
+    try:
+        buf = cache_path.read_bytes()
+        if len(buf) == DEFAULT_ICON_SIZE * DEFAULT_ICON_SIZE * 4:
+            return Image.frombuffer('RGBA', (DEFAULT_ICON_SIZE, DEFAULT_ICON_SIZE), buf, 'raw', 'RGBA', 0, 1)
+    except OSError:
+        pass
+    
+    image = draw_default_icon()
+    try:
+        ICON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix('.tmp')
+        tmp_path.write_bytes(image.tobytes())
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache default tray icon: {e}")
+    return image
+
+
+def draw_default_icon():
+    """Draw the default tray icon: a mint green circle with a "$"."""
     from PIL import Image, ImageDraw
     
     # Create a 32x32 image with a green circle (matching the mint accent color)
-    size = 32
+    size = DEFAULT_ICON_SIZE
     image = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(image)
     
@@ -221,6 +428,8 @@ def run_console_mode():
     print("[*] Starting Spendsight...")
     print("=" * 60)
     
+    app, needs_setup, Config = _backend_mod()
+    
     # Check if setup is needed
     if needs_setup():
         print("\n[!] First time setup detected!")
@@ -234,14 +443,19 @@ def run_console_mode():
     print("[OK] Press CTRL+C to stop the server\n")
     print("=" * 60)
     
-    # Auto-open browser in console mode too
-    threading.Timer(1.5, open_browser).start()
+    # Auto-open browser in console mode too, once the server is listening
+    threading.Thread(target=open_browser_when_ready, daemon=True).start()
+    
+    if IS_FROZEN:
+        # Packaged app without a tray icon: serve with waitress, as the tray does
+        run_flask_server()
+        return
     
     # Disable reloader on Windows to avoid socket issues
-    use_reloader = Config.DEBUG and platform.system() != 'Windows'
+    use_reloader = Config.DEBUG and sys.platform != 'win32'
     
     app.run(
-        host='0.0.0.0',
+        host=SERVER_HOST,
         port=Config.PORT,
         debug=Config.DEBUG,
         use_reloader=use_reloader
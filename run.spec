@@ -1,9 +1,18 @@
 # -*- mode: python ; coding: utf-8 -*-
 import certifi
+import os
+from PyInstaller.utils.hooks import collect_submodules
+
+# Record where the tray icon is bundled so run.py doesn't probe for it at startup
+TRAY_ICON_REL = 'spendsighticon.ico'
+os.makedirs(workpath, exist_ok=True)
+with open(os.path.join(workpath, '_bundle_paths.py'), 'w', encoding='utf-8') as f:
+    f.write('# Generated by run.spec\n')
+    f.write(f'TRAY_ICON_REL = {TRAY_ICON_REL!r}\n')
 
 a = Analysis(
     ['run.py'],
-    pathex=[],
+    pathex=[workpath],
     binaries=[],
     datas=[
         ('frontend/templates', 'frontend/templates'),
@@ -11,7 +20,7 @@ a = Analysis(
         # NOTE: 'data' folder is NOT bundled - it contains user's personal rules,
         # notes, and uploaded files. The app creates these directories automatically
         # via Config.init_app() when it starts. Users create their own data.
-        ('spendsighticon.ico', '.'),  # Include ICO icon in root for tray
+        (TRAY_ICON_REL, '.'),  # Include ICO icon in root for tray
         ('spendsighticon.png', '.'),  # Include PNG icon as fallback
         (certifi.where(), 'certifi'),  # Include SSL certificates
     ],
@@ -24,7 +33,8 @@ a = Analysis(
         'PIL.Image',
         'certifi',
         'ssl',
-    ],
+        '_bundle_paths',  # Generated above
+    ] + collect_submodules('waitress'),  # Production server for the frozen app
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -34,19 +44,18 @@ a = Analysis(
 )
 pyz = PYZ(a.pure)
 
+# One-folder build: the exe loads its libraries from the folder next to it
+# instead of unpacking the whole bundle to a temp dir on every launch
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='Spendsight',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
     upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
     console=False,  # Hide console window - app runs in system tray
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -55,3 +64,13 @@ exe = EXE(
     entitlements_file=None,
     icon='spendsighticon.ico',  # Use ICO for app icon (better Windows support)
 )
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    name='Spendsight',
+)
@@ -0,0 +1,54 @@
+"""Tests for the exclusion rule keyword scanners."""
+from datetime import datetime
+
+import pytest
+
+from backend.models import exclusion_rule
+from backend.models.exclusion_rule import ExclusionRuleEngine, _build_keyword_scanner
+from backend.models.transaction import Transaction
+
+# More keywords than fit in a 64-bit pattern id
+KEYWORDS = [f'merchant{i:03d}' for i in range(70)]
+
+
+def _transaction(description: str) -> Transaction:
+    date = datetime(2024, 1, 1)
+    return Transaction(
+        transaction_date=date,
+        post_date=date,
+        description=description,
+        amount=-10.0,
+        category='Shopping',
+        bank='chase'
+    )
+
+
+@pytest.fixture
+def hyperscan_only(monkeypatch):
+    """Force the hyperscan scanner by hiding pyahocorasick."""
+    pytest.importorskip('hyperscan')
+    monkeypatch.setattr(exclusion_rule, 'ahocorasick', None)
+
+
+def test_hyperscan_scanner_reports_every_keyword_bit(hyperscan_only):
+    keyword_bits = {keyword: 1 << i for i, keyword in enumerate(KEYWORDS)}
+    scan = _build_keyword_scanner(keyword_bits)
+    
+    for i, keyword in enumerate(KEYWORDS):
+        assert scan(f'pos {keyword} purchase') == 1 << i
+    assert scan('merchant001 and merchant069') == (1 << 1) | (1 << 69)
+    assert scan('no match here') == 0
+
+
+def test_hyperscan_sweep_with_more_than_64_keywords(hyperscan_only, tmp_path):
+    engine = ExclusionRuleEngine(storage_path=tmp_path / 'exclusion_rules.json')
+    with engine.bulk():
+        rules = [engine.add_rule([keyword]) for keyword in KEYWORDS]
+    
+    transactions = [_transaction(f'POS {keyword.upper()} #1') for keyword in KEYWORDS]
+    transactions.append(_transaction('COFFEE SHOP'))
+    remaining, swept_count = engine.sweep_transactions(transactions)
+    
+    assert swept_count == len(KEYWORDS)
+    assert [t.description for t in remaining] == ['COFFEE SHOP']
+    assert all(rule.swept_count == 1 for rule in rules)